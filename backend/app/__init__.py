@@ -1 +1,5 @@
 # Task P2-T-002: Setup Backend Python Environment
+from time import perf_counter
+
+# Start of `import app`, for the startup profile
+IMPORT_STARTED = perf_counter()
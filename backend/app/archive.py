@@ -0,0 +1,177 @@
+# Archive job: move old completed tasks from tasks to archived_tasks
+#
+#   python -m app.archive       run until nothing is left to archive
+#                               (e.g. from Heroku Scheduler)
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import DateTime, literal
+from sqlmodel import Session, delete, insert, select
+from app.cache import invalidate_user_cache
+from app.config import settings
+from app.database import get_engine
+from app.events import RESYNC_EVENT, task_events
+from app.models.archived_task import ArchivedTask
+from app.models.task import TASK_COLUMNS, Task
+from app.revisions import bump_revision
+from app.tombstones import record_tombstones
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def archive_cutoff() -> datetime:
+    """Completed tasks last updated before this are archived"""
+    return datetime.utcnow() - timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+
+
+def archive_batch(db: Session, cutoff: datetime, batch_size: int) -> Dict[str, int]:
+    """
+    Move up to batch_size archivable tasks in one transaction
+
+    The tasks are copied into archived_tasks and deleted from tasks. Each
+    affected user gets tombstones, so sync clients drop the tasks, and a
+    revision bump, so ETags and caches move on.
+    Each batch commits on its own, so an interrupted run loses nothing and
+    the next run picks up whatever is left.
+
+    Returns:
+        Dict[str, int]: tasks archived per user_id (empty when done)
+    """
+    candidates = (
+        select(Task.id)
+        .where(Task.completed, Task.updated_at < cutoff)
+        .order_by(Task.updated_at)
+        .limit(batch_size)
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        # Concurrent runs (several workers, or the CLI) take disjoint batches
+        candidates = candidates.with_for_update(skip_locked=True)
+    ids = db.exec(candidates).all()
+    if not ids:
+        return {}
+
+    # Conditions repeated: a task reopened since the SELECT stays put
+    archived_at = datetime.utcnow()
+    db.exec(insert(ArchivedTask).from_select(
+        [column.key for column in TASK_COLUMNS] + ["archived_at"],
+        select(*TASK_COLUMNS, literal(archived_at, DateTime))
+        .where(Task.id.in_(ids), Task.completed, Task.updated_at < cutoff)
+    ))
+    moved = db.exec(select(ArchivedTask.id, ArchivedTask.user_id).where(ArchivedTask.id.in_(ids))).all()
+    db.exec(
+        delete(Task)
+        .where(Task.id.in_([task_id for task_id, _ in moved]))
+        .execution_options(synchronize_session=False)
+    )
+
+    by_user: Dict[str, list] = {}
+    for task_id, user_id in moved:
+        by_user.setdefault(user_id, []).append(task_id)
+    for user_id in sorted(by_user):
+        record_tombstones(db, user_id, by_user[user_id])
+        bump_revision(db, user_id)
+    db.commit()
+
+    for user_id in by_user:
+        invalidate_user_cache(user_id)
+    return {user_id: len(task_ids) for user_id, task_ids in by_user.items()}
+
+
+def _archive_batch_in_session(cutoff: datetime, batch_size: int) -> Dict[str, int]:
+    # The job always uses the sync engine, like the schema step
+    with Session(get_engine()) as db:
+        return archive_batch(db, cutoff, batch_size)
+
+
+def run_archive() -> int:
+    """Archive everything past the cutoff, batch by batch; returns the task count"""
+    cutoff = archive_cutoff()
+    total = 0
+    while True:
+        counts = _archive_batch_in_session(cutoff, settings.ARCHIVE_BATCH_SIZE)
+        if not counts:
+            return total
+        total += sum(counts.values())
+        logger.info("Archived %d tasks (%d so far)", sum(counts.values()), total)
+        time.sleep(settings.ARCHIVE_BATCH_PAUSE_MS / 1000)
+
+
+class ArchiveJob:
+    """In-process archive runs every ARCHIVE_INTERVAL_MINUTES (when enabled)"""
+
+    def __init__(self):
+        self.runs = 0
+        self.archived = 0
+        self.last_run_at: Optional[float] = None
+        self.last_run_archived = 0
+        self.last_error: Optional[str] = None
+        self.running = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> int:
+        """One full run; batches go through the threadpool, change-feed clients get a resync"""
+        self.running = True
+        cutoff = archive_cutoff()
+        archived = 0
+        try:
+            while True:
+                counts = await run_in_threadpool(_archive_batch_in_session, cutoff, settings.ARCHIVE_BATCH_SIZE)
+                if not counts:
+                    break
+                archived += sum(counts.values())
+                for user_id in counts:
+                    await task_events.publish(user_id, RESYNC_EVENT, {})
+                await asyncio.sleep(settings.ARCHIVE_BATCH_PAUSE_MS / 1000)
+        finally:
+            self.running = False
+            self.runs += 1
+            self.archived += archived
+            self.last_run_archived = archived
+            self.last_run_at = time.time()
+        if archived:
+            logger.info("Archive run moved %d tasks", archived)
+        return archived
+
+    async def _loop(self, interval: float):
+        while True:
+            try:
+                await self.run_once()
+                self.last_error = None
+            except Exception as exc:
+                logger.exception("Archive run failed")
+                self.last_error = f"{type(exc).__name__}: {exc}"
+            await asyncio.sleep(interval)
+
+    def start(self):
+        """Schedule runs if ARCHIVE_INTERVAL_MINUTES is set (call on startup)"""
+        if settings.ARCHIVE_INTERVAL_MINUTES > 0 and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._loop(settings.ARCHIVE_INTERVAL_MINUTES * 60))
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "scheduled": self._task is not None,
+            "interval_minutes": settings.ARCHIVE_INTERVAL_MINUTES,
+            "archive_after_days": settings.ARCHIVE_AFTER_DAYS,
+            "running": self.running,
+            "runs": self.runs,
+            "archived": self.archived,
+            "last_run_at": self.last_run_at,
+            "last_run_archived": self.last_run_archived,
+            "last_error": self.last_error,
+        }
+
+
+archive_job = ArchiveJob()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    logger.info("Archive finished: %d tasks moved", run_archive())
@@ -0,0 +1,182 @@
+# Per-user read-through cache for task queries
+import importlib
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+from .config import settings
+from .database import run_db
+from .replica import read_router
+
+
+class TaskCacheBackend(ABC):
+    """
+    Storage interface for cached task query results
+
+    Values are stored together with the user revision they were read at;
+    a lookup only hits when the caller's current revision matches, so a
+    shared backend never serves data older than the database, even when
+    the write happened on another worker.
+    """
+
+    @abstractmethod
+    def get(self, user_id: str, key: Hashable, revision: int) -> Optional[Any]:
+        """Return the cached value for (user_id, key) at revision, or None"""
+
+    @abstractmethod
+    def set(self, user_id: str, key: Hashable, revision: int, value: Any):
+        """Store value for (user_id, key) as read at revision"""
+
+    @abstractmethod
+    def invalidate_user(self, user_id: str):
+        """Drop every entry for user_id"""
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """JSON-serializable counters"""
+
+
+def approximate_size(value: Any) -> int:
+    """Rough byte size of a cached value, used for the memory cap"""
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(approximate_size(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(approximate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class MemoryTaskCache(TaskCacheBackend):
+    """In-process LRU bounded by entry count, total size and TTL"""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # (user_id, key) -> (expires_at, revision, size, value)
+        self._entries: "OrderedDict[Tuple[str, Hashable], tuple]" = OrderedDict()
+        self._keys_by_user: Dict[str, Set[Hashable]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _remove(self, entry_key: Tuple[str, Hashable]):
+        _, _, size, _ = self._entries.pop(entry_key)
+        self._bytes -= size
+        user_keys = self._keys_by_user.get(entry_key[0])
+        if user_keys is not None:
+            user_keys.discard(entry_key[1])
+            if not user_keys:
+                del self._keys_by_user[entry_key[0]]
+
+    def get(self, user_id: str, key: Hashable, revision: int) -> Optional[Any]:
+        entry_key = (user_id, key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is None or entry[0] <= time.monotonic() or entry[1] != revision:
+                if entry is not None:
+                    self._remove(entry_key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(entry_key)
+            self.hits += 1
+            return entry[3]
+
+    def set(self, user_id: str, key: Hashable, revision: int, value: Any):
+        size = approximate_size(value)
+        if size > self.max_bytes:
+            return
+
+        entry_key = (user_id, key)
+        with self._lock:
+            if entry_key in self._entries:
+                self._remove(entry_key)
+
+            self._entries[entry_key] = (time.monotonic() + self.ttl, revision, size, value)
+            self._keys_by_user.setdefault(user_id, set()).add(key)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: str):
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._remove((user_id, key))
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "entries": len(self._entries),
+                "users": len(self._keys_by_user),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def build_task_cache(backend: str) -> Optional[TaskCacheBackend]:
+    """
+    Create the configured cache backend
+
+    Args:
+        backend: "memory", "none", or "package.module:ClassName" for a
+            shared TaskCacheBackend implementation (constructed with no args)
+
+    Returns:
+        Optional[TaskCacheBackend]: None when caching is disabled
+    """
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return MemoryTaskCache(
+            max_entries=settings.TASK_CACHE_MAX_ENTRIES,
+            max_bytes=settings.TASK_CACHE_MAX_BYTES,
+            ttl=settings.TASK_CACHE_TTL_SECONDS
+        )
+
+    module_name, _, class_name = backend.partition(":")
+    backend_class = getattr(importlib.import_module(module_name), class_name)
+    return backend_class()
+
+
+task_cache = build_task_cache(settings.TASK_CACHE_BACKEND)
+
+
+async def read_through(db, user_id: str, key: Hashable, revision: int, fn, *args):
+    """Serve fn(db, *args) from task_cache at revision, else query and populate"""
+    if task_cache is not None:
+        cached = task_cache.get(user_id, key, revision)
+        if cached is not None:
+            return cached
+
+    value = await run_db(db, fn, *args)
+    if task_cache is not None and value is not None:
+        task_cache.set(user_id, key, revision, value)
+    return value
+
+
+def invalidate_user_cache(user_id: str):
+    """
+    Drop cached task reads for user_id after a committed write
+
+    Also pins the user's reads to the primary for a while, so a lagging
+    read replica cannot hide the write from them.
+    """
+    read_router.pin(user_id)
+    if task_cache is not None:
+        task_cache.invalidate_user(user_id)
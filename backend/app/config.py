@@ -1,7 +1,7 @@
 # Task P2-T-004: Configure Development Database
 import os
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -13,6 +13,59 @@ class Settings(BaseSettings):
     PORT: int = 8000
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION_HOURS: int = 1
+    JWT_CACHE_ENABLED: bool = True  # Cache verified tokens until their exp
+    JWT_CACHE_MAX_ENTRIES: int = 10000
+    JWT_CACHE_MAX_TTL_SECONDS: int = 3600
+    DB_ASYNC: bool = False  # Use asyncpg/aiosqlite with AsyncSession
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 300  # Neon closes idle connections; recycle before that
+    DB_POOL_PRE_PING: bool = True
+    DB_CONNECTION_BUDGET: int = 0  # Connections for all workers together (0: DB_POOL_SIZE + DB_MAX_OVERFLOW each)
+    WEB_CONCURRENCY: int = 1  # Worker processes (set by gunicorn.conf.py / Heroku)
+    READ_DATABASE_URL: Optional[str] = None  # Read replica for GET routes (unset: primary only)
+    READ_REPLICA_MAX_LAG_SECONDS: float = 2.0  # Use the primary while the replica lags more
+    READ_REPLICA_PIN_SECONDS: float = 10.0  # Reads stay on the primary this long after a write
+    READ_REPLICA_CHECK_SECONDS: float = 5.0  # Health and lag check interval
+    TASKS_PAGE_DEFAULT_LIMIT: int = 100
+    TASKS_PAGE_MAX_LIMIT: int = 500
+    TASKS_BATCH_MAX_OPERATIONS: int = 1000
+    TASKS_EXPORT_BATCH_SIZE: int = 1000  # Rows fetched per server-side cursor batch
+    TASKS_IMPORT_BATCH_SIZE: int = 500  # Rows per INSERT/COPY transaction
+    TASKS_IMPORT_MAX_ERRORS: int = 100  # Row errors listed in the response
+    TASKS_SYNC_TOMBSTONE_RETENTION_DAYS: int = 30  # Older sync tokens get 410
+    TASKS_SYNC_OVERLAP_SECONDS: int = 5  # Re-sent window covering clock skew and late commits
+    TASK_EVENTS_QUEUE_SIZE: int = 100  # Pending events per connection before a resync
+    TASK_EVENTS_HEARTBEAT_SECONDS: int = 15  # Below proxy idle timeouts (Heroku: 55s)
+    TASK_EVENTS_MAX_CONNECTIONS_PER_USER: int = 10
+    TASK_EVENTS_PG_NOTIFY: bool = False  # Share events between workers via LISTEN/NOTIFY
+    METRICS_ENABLED: bool = True  # Record request metrics (Server-Timing, query budgets, GET /metrics)
+    METRICS_TOKEN: Optional[str] = None  # Bearer token for GET /metrics (unset: endpoint not served)
+    METRICS_SERVER_TIMING: bool = False  # Add Server-Timing (auth/db/serialize) to responses
+    SQL_SLOW_QUERY_MS: int = 200  # Log statements at least this slow (0 disables)
+    SQL_QUERY_BUDGET_STRICT: bool = False  # Raise instead of log when a route exceeds its query budget
+    DB_SCHEMA_MODE: str = "check"  # "check" (fingerprint), "create_all" (every boot) or "skip"
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory", "none", or "module:Class"
+    RATE_LIMIT_PER_SECOND: float = 20.0  # Sustained requests per user
+    RATE_LIMIT_BURST: int = 60  # Requests a user may send at once
+    RATE_LIMIT_MAX_USERS: int = 10000  # Buckets kept in memory
+    MAX_IN_FLIGHT_REQUESTS: int = 200  # Per worker; 503 beyond this (0 disables)
+    IDEMPOTENCY_ENABLED: bool = True  # Honor Idempotency-Key on mutations
+    IDEMPOTENCY_TTL_SECONDS: int = 86400  # How long a key's response is replayed
+    IDEMPOTENCY_LEASE_SECONDS: int = 30  # An unfinished key not renewed this long can be retried
+    IDEMPOTENCY_CACHE_MAX_ENTRIES: int = 10000  # In-memory replays per worker
+    WRITE_COALESCE_ENABLED: bool = False  # Group-commit task updates and toggles
+    WRITE_COALESCE_WINDOW_MS: float = 5.0  # How long an idle coalescer waits for more writes
+    WRITE_COALESCE_MAX_BATCH: int = 100  # Writes per group commit
+    ARCHIVE_AFTER_DAYS: int = 90  # Completed tasks untouched this long are archived
+    ARCHIVE_BATCH_SIZE: int = 500  # Tasks moved per transaction
+    ARCHIVE_BATCH_PAUSE_MS: int = 50  # Pause between batches to spare the primary
+    ARCHIVE_INTERVAL_MINUTES: int = 0  # Run the archive job in-process (0: only `python -m app.archive`)
+    TASK_CACHE_BACKEND: str = "memory"  # "memory", "none", or "module:Class"
+    TASK_CACHE_TTL_SECONDS: int = 300
+    TASK_CACHE_MAX_ENTRIES: int = 10000
+    TASK_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
     
     @property
     def cors_origins_list(self) -> List[str]:
@@ -1,27 +1,387 @@
 # Task P2-T-004: Configure Development Database
-from sqlmodel import SQLModel, create_engine, Session
+import threading
+from contextlib import asynccontextmanager
+from time import perf_counter
+from fastapi import Depends
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlmodel import SQLModel, create_engine, select, Session
 from .config import settings
+from .dependencies import get_current_user
+from .metrics import DB, request_timings
+from .pool_metrics import PoolStats, attach_invalidation_counter, timed_pool_class
+from .query_stats import instrument_engine, request_queries
+from .replica import measure_lag, read_router
+from .search import install_search
+from typing import Tuple
 
 
-# Create database engine with Neon PostgreSQL SSL support
-connect_args = {}
-if settings.DATABASE_URL.startswith("postgresql"):
-    # Enable SSL for Neon PostgreSQL in production
-    connect_args = {"sslmode": "require"}
+def worker_pool_size() -> Tuple[int, int]:
+    """
+    pool_size and max_overflow for one worker process
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=False,  # Disable SQL echo in production
-    connect_args=connect_args
-)
+    With DB_CONNECTION_BUDGET set, the budget is split evenly between the
+    WEB_CONCURRENCY workers, less the two connections the event bridge
+    opens per worker. Up to DB_POOL_SIZE of a worker's share is kept open,
+    the rest is overflow.
+    """
+    if not settings.DB_CONNECTION_BUDGET:
+        return settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW
+
+    share = settings.DB_CONNECTION_BUDGET // max(1, settings.WEB_CONCURRENCY)
+    if settings.TASK_EVENTS_PG_NOTIFY:
+        share -= 2
+    share = max(1, share)
+    pool_size = min(settings.DB_POOL_SIZE, share)
+    return pool_size, share - pool_size
+
+
+def pool_options(database_url: str, base_pool, stats: PoolStats) -> dict:
+    """
+    Engine keyword arguments for the configured pool settings
+
+    SQLite keeps SQLAlchemy's default pool, which does not take sizing options.
+    """
+    options = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    if make_url(database_url).get_backend_name() != "sqlite":
+        pool_size, max_overflow = worker_pool_size()
+        options.update(
+            poolclass=timed_pool_class(base_pool, stats),
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+    return options
+
+
+def _create_engine(database_url: str, stats: PoolStats):
+    # Create database engine with Neon PostgreSQL SSL support
+    connect_args = {}
+    if database_url.startswith("postgresql"):
+        # Enable SSL for Neon PostgreSQL in production
+        connect_args = {"sslmode": "require"}
+
+    engine = create_engine(
+        database_url,
+        echo=False,  # Disable SQL echo in production
+        connect_args=connect_args,
+        **pool_options(database_url, QueuePool, stats)
+    )
+    attach_invalidation_counter(engine, stats)
+    instrument_engine(engine)
+    return engine
+
+
+def build_async_url(database_url: str):
+    """
+    Map a sync DATABASE_URL onto its async driver
+
+    postgresql -> postgresql+asyncpg, sqlite -> sqlite+aiosqlite.
+    asyncpg does not understand libpq query options such as sslmode,
+    so those are stripped and SSL is passed through connect_args instead.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == "postgresql":
+        url = url.difference_update_query(["sslmode", "channel_binding"])
+        return url.set(drivername="postgresql+asyncpg")
+    if url.get_backend_name() == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite")
+    return url
+
+
+def _create_async_engine(database_url: str, stats: PoolStats):
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    async_connect_args = {}
+    if database_url.startswith("postgresql"):
+        async_connect_args = {"ssl": "require"}
+
+    async_engine = create_async_engine(
+        build_async_url(database_url),
+        echo=False,
+        connect_args=async_connect_args,
+        **pool_options(database_url, AsyncAdaptedQueuePool, stats)
+    )
+    attach_invalidation_counter(async_engine.sync_engine, stats)
+    instrument_engine(async_engine.sync_engine)
+    return async_engine
+
+
+# Engines are created on first use rather than at import, so importing the
+# app (and a dyno booting with DB_SCHEMA_MODE=skip) never touches the
+# database driver or pool. Pools open connections lazily as well.
+pool_stats = PoolStats()
+async_pool_stats = PoolStats()
+read_pool_stats = PoolStats()
+async_read_pool_stats = PoolStats()
+_engine = None
+_async_engine = None
+_read_engine = None
+_async_read_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """The sync engine, created on first call"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = _create_engine(settings.DATABASE_URL, pool_stats)
+    return _engine
+
+
+def get_async_engine():
+    """
+    The async engine, created on first call; None unless DB_ASYNC is enabled,
+    so asyncpg/aiosqlite stay optional for the default sync deployment
+    """
+    global _async_engine
+    if _async_engine is None and settings.DB_ASYNC:
+        with _engine_lock:
+            if _async_engine is None:
+                _async_engine = _create_async_engine(settings.DATABASE_URL, async_pool_stats)
+    return _async_engine
+
+
+def get_read_engine():
+    """The sync READ_DATABASE_URL engine, created on first call; None if unset"""
+    global _read_engine
+    if _read_engine is None and settings.READ_DATABASE_URL:
+        with _engine_lock:
+            if _read_engine is None:
+                _read_engine = _create_engine(settings.READ_DATABASE_URL, read_pool_stats)
+    return _read_engine
+
+
+def get_async_read_engine():
+    """The async READ_DATABASE_URL engine; None if unset or DB_ASYNC is off"""
+    global _async_read_engine
+    if _async_read_engine is None and settings.READ_DATABASE_URL and settings.DB_ASYNC:
+        with _engine_lock:
+            if _async_read_engine is None:
+                _async_read_engine = _create_async_engine(settings.READ_DATABASE_URL, async_read_pool_stats)
+    return _async_read_engine
+
+
+def _revision_statement(user_id: str):
+    from .models.revision import UserRevision
+
+    return select(UserRevision.revision).where(UserRevision.user_id == user_id)
+
+
+def replica_caught_up(user_id: str) -> bool:
+    """
+    True if the replica has replayed user_id's latest write
+
+    Every task write bumps the user's revision in the same transaction, so
+    a replica with the primary's revision has all of the user's changes,
+    whichever worker or dyno made them. Costs a primary-key read on each
+    side (not counted against the route's query budget); a replica error
+    counts as behind.
+    """
+    statement = _revision_statement(user_id)
+    token = request_queries.set(None)
+    try:
+        with get_engine().connect() as primary:
+            latest = primary.execute(statement).scalar() or 0
+        if not latest:
+            return True
+        with get_read_engine().connect() as replica:
+            return (replica.execute(statement).scalar() or 0) >= latest
+    except SQLAlchemyError:
+        return False
+    finally:
+        request_queries.reset(token)
+
+
+async def async_replica_caught_up(user_id: str) -> bool:
+    """Async counterpart of replica_caught_up"""
+    statement = _revision_statement(user_id)
+    token = request_queries.set(None)
+    try:
+        async with get_async_engine().connect() as primary:
+            latest = (await primary.execute(statement)).scalar() or 0
+        if not latest:
+            return True
+        async with get_async_read_engine().connect() as replica:
+            return ((await replica.execute(statement)).scalar() or 0) >= latest
+    except SQLAlchemyError:
+        return False
+    finally:
+        request_queries.reset(token)
+
+
+def _route_read(usable: bool, caught_up: bool) -> bool:
+    replica = usable and caught_up
+    read_router.record_read(replica, behind=usable and not caught_up)
+    return replica
+
+
+def read_engine_for(user_id: str):
+    """Sync engine to serve user_id's reads from: the replica when usable and current, else the primary"""
+    usable = read_router.use_replica(user_id)
+    replica = _route_read(usable, usable and replica_caught_up(user_id))
+    return get_read_engine() if replica else get_engine()
+
+
+async def async_read_engine_for(user_id: str):
+    """Async counterpart of read_engine_for"""
+    usable = read_router.use_replica(user_id)
+    replica = _route_read(usable, usable and await async_replica_caught_up(user_id))
+    return get_async_read_engine() if replica else get_async_engine()
+
+
+def check_replica() -> float:
+    """Connect to the replica and return its lag in seconds (raises if unreachable)"""
+    with get_read_engine().connect() as connection:
+        return measure_lag(connection)
+
+
+def __getattr__(name: str):
+    # Keeps `from app.database import engine` working for scripts
+    if name == "engine":
+        return get_engine()
+    if name == "async_engine":
+        return get_async_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def dispose_engines_after_fork():
+    """
+    Drop pooled connections inherited from a parent process (gunicorn post_fork)
+
+    close=False leaves the parent's connections open for the parent; the
+    child simply starts with empty pools.
+    """
+    for engine in (_engine, _read_engine):
+        if engine is not None:
+            engine.dispose(close=False)
+    for async_engine in (_async_engine, _async_read_engine):
+        if async_engine is not None:
+            async_engine.sync_engine.dispose(close=False)
+
+
+def get_pool_status() -> dict:
+    """Live pool occupancy and checkout timings for each engine created so far"""
+    status = {}
+    if _engine is not None:
+        status["primary"] = pool_stats.snapshot(_engine.pool)
+    if _async_engine is not None:
+        status["primary_async"] = async_pool_stats.snapshot(_async_engine.sync_engine.pool)
+    if _read_engine is not None:
+        status["replica"] = read_pool_stats.snapshot(_read_engine.pool)
+    if _async_read_engine is not None:
+        status["replica_async"] = async_read_pool_stats.snapshot(_async_read_engine.sync_engine.pool)
+    return status
 
 
 def create_db_and_tables():
-    """Create all database tables"""
+    """
+    Create all database tables
+
+    Indexes added to a model after its table already exists are not
+    created by create_all, so each one is created if missing, along with
+    the dialect-specific full-text search index.
+    """
+    engine = get_engine()
     SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        for table in SQLModel.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+        install_search(connection)
 
 
 def get_db():
     """FastAPI dependency for database session"""
-    with Session(engine) as session:
+    with Session(get_engine()) as session:
+        yield session
+
+
+async def get_async_db():
+    """FastAPI dependency for async database session"""
+    # Objects returned to FastAPI are serialized after the handler returns,
+    # so they must not expire (and lazy-load) once the transaction commits
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        yield session
+
+
+# Session dependency used by the routes, selected by DB_ASYNC
+get_session = get_async_db if settings.DB_ASYNC else get_db
+
+
+def get_read_db(current_user_id: str = Depends(get_current_user)):
+    """
+    FastAPI dependency for a read-only database session
+
+    Served by READ_DATABASE_URL when it is configured, healthy, within
+    READ_REPLICA_MAX_LAG_SECONDS and has replayed the user's latest write
+    (replica_caught_up); by the primary otherwise. Only for GET routes: nothing may be written
+    through it.
+    """
+    with Session(read_engine_for(current_user_id)) as session:
+        yield session
+
+
+async def get_async_read_db(current_user_id: str = Depends(get_current_user)):
+    """FastAPI dependency for an async read-only database session (see get_read_db)"""
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    async with AsyncSession(await async_read_engine_for(current_user_id), expire_on_commit=False) as session:
+        yield session
+
+
+# Read-only session dependency used by the GET routes, selected by DB_ASYNC
+get_read_session = get_async_read_db if settings.DB_ASYNC else get_read_db
+
+
+@asynccontextmanager
+async def session_scope():
+    """Session of the DB_ASYNC-selected type for code outside a route (e.g. middleware)"""
+    if settings.DB_ASYNC:
+        from sqlmodel.ext.asyncio.session import AsyncSession
+
+        async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+            yield session
+        return
+
+    session = Session(get_engine())
+    try:
         yield session
+    finally:
+        # Closing may roll back over the network; keep it off the event loop
+        await run_in_threadpool(session.close)
+
+
+async def run_db(db, fn, *args, **kwargs):
+    """
+    Run fn(session, *args, **kwargs) against either session type
+
+    Query code is written once against a sync Session. With an AsyncSession
+    it runs on the event loop via run_sync (no worker thread); with a sync
+    Session it is offloaded to the threadpool as a sync route would be.
+    (Only AsyncSession has run_sync; checked by name so the asyncio
+    extension is never imported in sync mode.)
+    """
+    timings = request_timings.get()
+    if timings is None:
+        if hasattr(db, "run_sync"):
+            return await db.run_sync(fn, *args, **kwargs)
+        return await run_in_threadpool(fn, db, *args, **kwargs)
+
+    # Server-Timing enabled: attribute the elapsed time to the db phase
+    start = perf_counter()
+    try:
+        if hasattr(db, "run_sync"):
+            return await db.run_sync(fn, *args, **kwargs)
+        return await run_in_threadpool(fn, db, *args, **kwargs)
+    finally:
+        timings[DB] += perf_counter() - start
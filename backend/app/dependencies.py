@@ -1,11 +1,15 @@
 # Task P2-T-010: Create FastAPI Authentication Dependency
+from time import perf_counter
 from fastapi import Header, HTTPException
+from .metrics import AUTH, add_timing
 from .middleware.auth import get_token_from_header, verify_jwt
 
 
-def get_current_user(authorization: str = Header(...)) -> str:
+async def get_current_user(authorization: str = Header(...)) -> str:
     """
     FastAPI dependency to extract and verify current user from JWT
+
+    Declared async so it runs on the event loop instead of the threadpool
     
     Args:
         authorization: Authorization header (Bearer <token>)
@@ -20,7 +24,9 @@ def get_current_user(authorization: str = Header(...)) -> str:
     token = get_token_from_header(authorization)
     
     # Verify token and get payload
+    start = perf_counter()
     payload = verify_jwt(token)
+    add_timing(AUTH, perf_counter() - start)
     
     # Extract user_id from payload
     user_id = payload.get("sub")
@@ -0,0 +1,24 @@
+# Application-wide exception handlers (registered in main)
+from fastapi import Request, status
+from fastapi.exception_handlers import request_validation_exception_handler
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from app.config import settings
+
+
+def _too_long(exc: RequestValidationError, loc: tuple) -> bool:
+    return any(error["type"] == "too_long" and tuple(error["loc"]) == loc for error in exc.errors())
+
+
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    """
+    FastAPI's usual 422, except for request bodies that are too large to
+    process at all, which get 413: a batch over TASKS_BATCH_MAX_OPERATIONS
+    is rejected while validating, before any operation is parsed
+    """
+    if _too_long(exc, ("body", "operations")):
+        return JSONResponse(
+            {"detail": f"Batch exceeds {settings.TASKS_BATCH_MAX_OPERATIONS} operations"},
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+    return await request_validation_exception_handler(request, exc)
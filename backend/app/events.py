@@ -0,0 +1,234 @@
+# Per-user task change feed: in-process fan-out with an optional Postgres bridge
+import asyncio
+import json
+import logging
+import select
+import threading
+from fastapi.concurrency import run_in_threadpool
+from app.config import settings
+from app.responses import dumps
+from typing import Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY channel shared by every worker when TASK_EVENTS_PG_NOTIFY is on
+NOTIFY_CHANNEL = "task_events"
+
+# Sent instead of the backlog when a subscriber falls behind, and to
+# everyone after the bridge reconnects: the client should call /tasks/sync
+RESYNC_EVENT = "resync"
+
+
+class Subscription:
+    """One connected client: a bounded queue of pre-rendered SSE messages"""
+
+    def __init__(self, user_id: str, max_queued: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        self.dropped = 0
+
+    def offer(self, message: str):
+        """Queue message without blocking the publisher"""
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Slow consumer: discard its backlog rather than buffer without
+            # bound or stall other subscribers, and ask it to resync
+            while not self.queue.empty():
+                self.queue.get_nowait()
+                self.dropped += 1
+            self.queue.put_nowait(format_event(RESYNC_EVENT, {}))
+
+
+def format_event(event: str, data: dict, event_id: Optional[int] = None) -> str:
+    """Render one Server-Sent Events message"""
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines += [f"event: {event}", f"data: {dumps(data).decode()}"]
+    return "\n".join(lines) + "\n\n"
+
+
+class PostgresBridge:
+    """
+    Relays events between workers over LISTEN/NOTIFY
+
+    Uses two dedicated psycopg2 connections outside the pool: one blocked
+    in LISTEN on a background thread, one for NOTIFY. Every worker,
+    including the publisher, delivers what it hears on the channel.
+    """
+
+    def __init__(self, feed: "ChangeFeed"):
+        self.feed = feed
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._notify_lock = threading.Lock()
+        self._notify_connection = None
+
+    def _connect(self):
+        from app.database import get_engine
+
+        engine = get_engine()
+        cargs, cparams = engine.dialect.create_connect_args(engine.url)
+        cparams.setdefault("sslmode", "require")
+        connection = engine.dialect.loaded_dbapi.connect(*cargs, **cparams)
+        connection.autocommit = True
+        return connection
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._thread = threading.Thread(target=self._listen, name="task-events-listen", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+        if self._notify_connection is not None:
+            self._notify_connection.close()
+
+    def notify(self, payload: str):
+        """Send payload on the channel (blocking; run in the threadpool)"""
+        with self._notify_lock:
+            for attempt in range(2):
+                try:
+                    if self._notify_connection is None or self._notify_connection.closed:
+                        self._notify_connection = self._connect()
+                    with self._notify_connection.cursor() as cursor:
+                        cursor.execute("SELECT pg_notify(%s, %s)", (NOTIFY_CHANNEL, payload))
+                    return
+                except Exception:
+                    # Retry once on a fresh connection (e.g. server restart)
+                    self._notify_connection = None
+                    if attempt:
+                        raise
+
+    def _listen(self):
+        while not self._stop.is_set():
+            connection = None
+            try:
+                connection = self._connect()
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                logger.info("Task event bridge listening")
+                # Events sent while we were disconnected are lost
+                self._loop.call_soon_threadsafe(self.feed.deliver_all, RESYNC_EVENT, {})
+
+                while not self._stop.is_set():
+                    if select.select([connection], [], [], 1.0) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notify = connection.notifies.pop(0)
+                        self._loop.call_soon_threadsafe(self.feed.deliver_payload, notify.payload)
+            except Exception:
+                logger.exception("Task event bridge disconnected; reconnecting")
+                self._stop.wait(5)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+
+class ChangeFeed:
+    """Registry of subscriptions by user and the entry point for publishing"""
+
+    def __init__(self, max_queued: int):
+        self.max_queued = max_queued
+        self._subscriptions: Dict[str, Set[Subscription]] = {}
+        self._next_id = 0
+        self._published = 0
+        self._dropped = 0
+        self.bridge: Optional[PostgresBridge] = None
+
+    def connection_count(self, user_id: str) -> int:
+        return len(self._subscriptions.get(user_id, ()))
+
+    def subscribe(self, user_id: str, max_connections: Optional[int] = None) -> Optional[Subscription]:
+        """
+        Register a subscription for user_id
+
+        Returns None if user_id already has max_connections. The check and
+        the registration happen without yielding to the event loop, so
+        concurrent connects cannot all pass the check.
+        """
+        if max_connections is not None and self.connection_count(user_id) >= max_connections:
+            return None
+        subscription = Subscription(user_id, self.max_queued)
+        self._subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Release a subscription; safe to call more than once"""
+        subscriptions = self._subscriptions.get(subscription.user_id)
+        if subscriptions is None or subscription not in subscriptions:
+            return
+        self._dropped += subscription.dropped
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.user_id]
+
+    def deliver(self, user_id: str, event: str, data: dict):
+        """Fan an event out to this process's subscribers for user_id"""
+        subscriptions = self._subscriptions.get(user_id)
+        if not subscriptions:
+            return
+        # Rendered once and shared by every connection
+        self._next_id += 1
+        message = format_event(event, data, self._next_id)
+        for subscription in list(subscriptions):
+            subscription.offer(message)
+
+    def deliver_all(self, event: str, data: dict):
+        for user_id in list(self._subscriptions):
+            self.deliver(user_id, event, data)
+
+    def deliver_payload(self, payload: str):
+        try:
+            message = json.loads(payload)
+            self.deliver(message["user_id"], message["event"], message["data"])
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed task event payload")
+
+    async def publish(self, user_id: str, event: str, data: dict):
+        """
+        Publish a committed change; call after the write has committed
+
+        Without the bridge this is a local fan-out. With it, the event
+        reaches local subscribers through the channel like everyone else's.
+        A failed NOTIFY is logged, never raised: the write already succeeded.
+        """
+        self._published += 1
+        if self.bridge is None:
+            self.deliver(user_id, event, data)
+            return
+
+        payload = dumps({"user_id": user_id, "event": event, "data": data}).decode()
+        try:
+            await run_in_threadpool(self.bridge.notify, payload)
+        except Exception:
+            logger.exception("Task event NOTIFY failed")
+            self.deliver(user_id, event, data)
+
+    def start(self):
+        """Start the LISTEN/NOTIFY bridge if configured (call on startup)"""
+        if settings.TASK_EVENTS_PG_NOTIFY and settings.DATABASE_URL.startswith("postgresql"):
+            self.bridge = PostgresBridge(self)
+            self.bridge.start(asyncio.get_running_loop())
+
+    def stop(self):
+        if self.bridge is not None:
+            self.bridge.stop()
+            self.bridge = None
+
+    def stats(self) -> dict:
+        subscriptions = [s for group in self._subscriptions.values() for s in group]
+        return {
+            "users": len(self._subscriptions),
+            "connections": len(subscriptions),
+            "published": self._published,
+            "queued": sum(s.queue.qsize() for s in subscriptions),
+            "dropped": self._dropped + sum(s.dropped for s in subscriptions),
+            "bridge": "postgres" if self.bridge is not None else None,
+        }
+
+
+task_events = ChangeFeed(settings.TASK_EVENTS_QUEUE_SIZE)
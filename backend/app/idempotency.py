@@ -0,0 +1,186 @@
+# Idempotency-Key storage: database table with an in-memory front cache
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, delete, select, update
+from app.config import settings
+from app.models.idempotency import IdempotencyRecord
+from typing import NamedTuple, Optional, Tuple
+
+
+class StoredResponse(NamedTuple):
+    """A key's record: the request it belongs to and, once finished, its response"""
+    request_hash: str
+    status_code: Optional[int]  # None while the first request is running
+    content_type: Optional[str]
+    body: bytes
+    expires_at: Optional[datetime]  # The record's expiry (UTC); None before it is stored
+
+
+def request_fingerprint(method: str, path: str, query: bytes, body: bytes) -> str:
+    """Hash identifying a request, to detect a key reused for a different one"""
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), query, body):
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+_RECORD_COLUMNS = (
+    IdempotencyRecord.request_hash, IdempotencyRecord.status_code,
+    IdempotencyRecord.content_type, IdempotencyRecord.body, IdempotencyRecord.expires_at
+)
+
+
+def _select_record(db: Session, user_id: str, key: str) -> Optional[StoredResponse]:
+    row = db.exec(
+        select(*_RECORD_COLUMNS).where(IdempotencyRecord.user_id == user_id, IdempotencyRecord.key == key)
+    ).first()
+    return StoredResponse(row[0], row[1], row[2], row[3] or b"", row[4]) if row is not None else None
+
+
+def lease_deadline() -> datetime:
+    """expires_at for a key whose request is (still) running"""
+    return datetime.utcnow() + timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS)
+
+
+def _owned(user_id: str, key: str, lease: datetime) -> tuple:
+    # The unfinished record this owner reserved, if it still holds it
+    return (
+        IdempotencyRecord.user_id == user_id,
+        IdempotencyRecord.key == key,
+        IdempotencyRecord.status_code.is_(None),
+        IdempotencyRecord.expires_at == lease,
+    )
+
+
+def reserve_key(db: Session, user_id: str, key: str, request_hash: str, lease: datetime) -> Optional[StoredResponse]:
+    """
+    Claim key for a new request, leased until lease
+
+    Returns None if the caller now owns the key and should run the request,
+    or the existing record if the key was already used (possibly by a
+    request that is still running, possibly on another worker).
+    Expired keys of the user are swept in the same transaction, including
+    reservations whose lease lapsed (the owner died), so a retry takes over.
+    """
+    now = datetime.utcnow()
+    db.exec(
+        delete(IdempotencyRecord)
+        .where(IdempotencyRecord.user_id == user_id, IdempotencyRecord.expires_at < now)
+        .execution_options(synchronize_session=False)
+    )
+    existing = _select_record(db, user_id, key)
+    if existing is not None:
+        db.commit()
+        return existing
+
+    db.add(IdempotencyRecord(
+        user_id=user_id,
+        key=key,
+        request_hash=request_hash,
+        expires_at=lease
+    ))
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another request claimed the key between our SELECT and INSERT
+        db.rollback()
+        return _select_record(db, user_id, key)
+    return None
+
+
+def renew_key(db: Session, user_id: str, key: str, lease: datetime, new_lease: datetime) -> bool:
+    """Extend the owner's lease; False if the key is no longer its own"""
+    renewed = db.exec(
+        update(IdempotencyRecord)
+        .where(*_owned(user_id, key, lease))
+        .values(expires_at=new_lease)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return renewed > 0
+
+
+def complete_key(db: Session, user_id: str, key: str, lease: datetime, response: StoredResponse) -> Optional[StoredResponse]:
+    """
+    Store the response of the request that owns key under lease
+
+    The response is kept for IDEMPOTENCY_TTL_SECONDS from now. Returns the
+    stored record, or None if the lease lapsed and the key is gone or was
+    taken over by a retry (response.expires_at is ignored).
+    """
+    stored = db.exec(
+        update(IdempotencyRecord)
+        .where(*_owned(user_id, key, lease))
+        .values(
+            status_code=response.status_code,
+            content_type=response.content_type,
+            body=response.body,
+            expires_at=datetime.utcnow() + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS)
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    record = _select_record(db, user_id, key) if stored else None
+    db.commit()
+    return record
+
+
+def release_key(db: Session, user_id: str, key: str, lease: datetime):
+    """Give up an unfinished key (the request failed) so a retry can run"""
+    db.exec(
+        delete(IdempotencyRecord)
+        .where(*_owned(user_id, key, lease))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+class ResponseCache:
+    """
+    In-process LRU of finished responses in front of the table
+
+    Only used from the event loop thread. Each entry expires at its
+    record's expires_at, so a hit is always a response the table still holds.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: str, key: str) -> Optional[StoredResponse]:
+        entry = self._entries.get((user_id, key))
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[(user_id, key)]
+            self.misses += 1
+            return None
+        self._entries.move_to_end((user_id, key))
+        self.hits += 1
+        return entry[1]
+
+    def put(self, user_id: str, key: str, response: StoredResponse):
+        remaining = (response.expires_at - datetime.utcnow()).total_seconds()
+        if remaining <= 0:
+            return
+        self._entries[(user_id, key)] = (time.monotonic() + remaining, response)
+        self._entries.move_to_end((user_id, key))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+response_cache = ResponseCache(settings.IDEMPOTENCY_CACHE_MAX_ENTRIES)
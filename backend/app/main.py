@@ -1,10 +1,36 @@
 # P2-T-008: FastAPI application entry point
+import hmac
 import logging
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.database import create_db_and_tables
+from app.database import check_replica, create_db_and_tables, get_pool_status
+from app.errors import validation_exception_handler
+from app.archive import archive_job
+from app.cache import task_cache
+from app.events import task_events
+from app.idempotency import response_cache
+from app.metrics import metrics_registry
+from app.middleware.admission import AdmissionControlMiddleware
+from app.middleware.auth import token_cache
+from app.middleware.idempotency import IdempotencyMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.rate_limit import rate_limit
+from app.replica import read_router
+from app.schema import SchemaDriftError, ensure_schema
+from app.startup_profile import startup_profile
+from app.write_coalescer import write_coalescer
+from app.routes.archive import router as archive_router
+from app.routes.batch import router as batch_router
+from app.routes.events import router as events_router
+from app.routes.export import router as export_router
+from app.routes.imports import router as import_router
+from app.routes.stats import router as stats_router
+from app.routes.sync import router as sync_router
 from app.routes.tasks import router as tasks_router
+from typing import Optional
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -20,27 +46,104 @@ app = FastAPI(
     openapi_url="/api/openapi.json"
 )
 
+# Idempotency-Key replay; inside admission control so rejected requests never claim a key
+if settings.IDEMPOTENCY_ENABLED:
+    app.add_middleware(IdempotencyMiddleware, cache=response_cache)
+
+# Admission control; added before CORS so rejections still carry CORS headers
+app.add_middleware(
+    AdmissionControlMiddleware,
+    rate_limit=rate_limit,
+    max_in_flight=settings.MAX_IN_FLIGHT_REQUESTS,
+    registry=metrics_registry
+)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins_list,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
-    allow_headers=["Content-Type", "Authorization"],
+    allow_headers=["Content-Type", "Authorization", "If-None-Match", "Idempotency-Key"],
+    expose_headers=["X-Next-Cursor", "ETag", "Server-Timing", "Retry-After", "Idempotent-Replayed"],
 )
 
+# Request metrics; added last so it wraps everything, CORS included
+if settings.METRICS_ENABLED:
+    app.add_middleware(
+        MetricsMiddleware,
+        registry=metrics_registry,
+        server_timing=settings.METRICS_SERVER_TIMING
+    )
+
 
 @app.on_event("startup")
 def on_startup():
-    """Create database tables on startup"""
-    try:
-        logger.info("Creating database tables...")
-        create_db_and_tables()
-        logger.info("Database tables created successfully")
-    except Exception as e:
-        logger.error(f"Error creating database tables: {e}")
-        # Don't crash the app if tables already exist
-        pass
+    """Bring the database schema up to date on startup (see DB_SCHEMA_MODE)"""
+    with startup_profile.phase("schema"):
+        try:
+            if settings.DB_SCHEMA_MODE == "create_all":
+                logger.info("Creating database tables...")
+                create_db_and_tables()
+                logger.info("Database tables created successfully")
+            elif settings.DB_SCHEMA_MODE == "check":
+                applied = ensure_schema()
+                startup_profile.notes["schema"] = "applied" if applied else "current"
+            else:
+                # Applied out of band by `python -m app.schema`; the engine
+                # is not even created until the first request
+                startup_profile.notes["schema"] = "skipped"
+        except SchemaDriftError:
+            # Serving against tables the code no longer matches would fail
+            # request by request; refuse to start until migrated
+            raise
+        except Exception as e:
+            logger.error(f"Error creating database tables: {e}")
+            # Don't crash the app if tables already exist
+            pass
+
+
+@app.on_event("startup")
+async def start_task_events():
+    """Start the cross-worker event bridge when configured"""
+    with startup_profile.phase("events"):
+        task_events.start()
+
+
+@app.on_event("startup")
+async def start_replica_monitor():
+    """Start checking the read replica's health and lag when configured"""
+    read_router.start(check_replica, settings.READ_REPLICA_CHECK_SECONDS)
+
+
+@app.on_event("startup")
+async def start_archive_job():
+    """Schedule in-process archive runs when ARCHIVE_INTERVAL_MINUTES is set"""
+    archive_job.start()
+
+
+@app.on_event("startup")
+def log_startup_profile():
+    """Log import and startup timings (registered last)"""
+    startup_profile.log()
+
+
+@app.on_event("shutdown")
+def stop_task_events():
+    """Close the event bridge connections"""
+    task_events.stop()
+
+
+@app.on_event("shutdown")
+def stop_archive_job():
+    """Cancel scheduled archive runs"""
+    archive_job.stop()
+
+
+@app.on_event("shutdown")
+def stop_replica_monitor():
+    """Stop the read replica health checks"""
+    read_router.stop()
 
 
 @app.get("/")
@@ -60,5 +163,113 @@ def health_check():
     return {"status": "ok"}
 
 
-# Register routers
+@app.get("/health/db")
+def database_pool_health():
+    """Connection pool occupancy and checkout wait times"""
+    return {"status": "ok", "pools": get_pool_status()}
+
+
+@app.get("/health/replica")
+async def replica_health():
+    """Read replica health, lag and how many reads it served"""
+    return {"status": "ok", "replica": read_router.stats()}
+
+
+@app.get("/health/auth")
+def auth_cache_health():
+    """Verified-token cache hit/miss counters"""
+    return {
+        "status": "ok",
+        "token_cache": token_cache.stats() if token_cache is not None else None
+    }
+
+
+@app.get("/health/cache")
+def task_cache_health():
+    """Task read cache hit/miss counters"""
+    return {
+        "status": "ok",
+        "task_cache": task_cache.stats() if task_cache is not None else None
+    }
+
+
+@app.get("/health/admission")
+async def admission_health():
+    """Rate limit state and rejected request counts"""
+    return {
+        "status": "ok",
+        "rate_limit": rate_limit.stats() if rate_limit is not None else None,
+        "max_in_flight": settings.MAX_IN_FLIGHT_REQUESTS,
+        "rejected": metrics_registry.rejections,
+    }
+
+
+@app.get("/health/idempotency")
+async def idempotency_health():
+    """Idempotency-Key replay cache counters"""
+    return {
+        "status": "ok",
+        "enabled": settings.IDEMPOTENCY_ENABLED,
+        "replay_cache": response_cache.stats(),
+    }
+
+
+@app.get("/health/writes")
+async def write_coalescer_health():
+    """Group commit batch counters (null when WRITE_COALESCE_ENABLED is off)"""
+    return {
+        "status": "ok",
+        "write_coalescer": write_coalescer.stats() if write_coalescer is not None else None
+    }
+
+
+@app.get("/health/archive")
+async def archive_health():
+    """Archive job schedule and moved task counts"""
+    return {"status": "ok", "archive": archive_job.stats()}
+
+
+@app.get("/health/startup")
+def startup_health():
+    """Import and startup phase timings of this worker"""
+    return {"status": "ok", "startup": startup_profile.report()}
+
+
+@app.get("/health/events")
+async def task_events_health():
+    """Open change-feed connections and delivery counters"""
+    return {"status": "ok", "task_events": task_events.stats()}
+
+
+async def metrics(authorization: Optional[str] = Header(None)):
+    """Request metrics in Prometheus text format (Bearer METRICS_TOKEN required)"""
+    expected = f"Bearer {settings.METRICS_TOKEN}".encode()
+    if not hmac.compare_digest((authorization or "").encode(), expected):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    # Async so rendering never races the event loop updating the registry
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+
+# Internal only: not served at all unless a scrape token is configured
+if settings.METRICS_ENABLED and settings.METRICS_TOKEN:
+    app.add_api_route("/metrics", metrics, methods=["GET"], include_in_schema=False)
+
+
+# Register routers (fixed /tasks/<name> paths before /tasks/{task_id})
+# Oversized batches are rejected during validation but still answered with 413
+app.add_exception_handler(RequestValidationError, validation_exception_handler)
+
+app.include_router(archive_router)
+app.include_router(batch_router)
+app.include_router(events_router)
+app.include_router(export_router)
+app.include_router(import_router)
+app.include_router(stats_router)
+app.include_router(sync_router)
 app.include_router(tasks_router)
+
+startup_profile.imported()
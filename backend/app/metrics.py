@@ -0,0 +1,143 @@
+# Request metrics in Prometheus text format, and per-request phase timings
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+# Upper bounds of the histogram buckets (+Inf is implicit)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+# Route label for requests that matched no route, so arbitrary paths never
+# become label values
+UNMATCHED_ROUTE = "unmatched"
+
+# Indexes into the per-request timings list
+AUTH, DB, SERIALIZE = 0, 1, 2
+
+# Seconds spent per phase of the current request: [auth, db, serialize].
+# Only set while Server-Timing is enabled; None means "not timing".
+request_timings: ContextVar[Optional[List[float]]] = ContextVar("request_timings", default=None)
+
+
+def add_timing(phase: int, seconds: float):
+    """Add seconds to a phase of the current request, if it is being timed"""
+    timings = request_timings.get()
+    if timings is not None:
+        timings[phase] += seconds
+
+
+class Histogram:
+    """Fixed-bucket histogram; counts are per bucket, cumulated on render"""
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def render(self, name: str, labels: str) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        cumulative += self.counts[-1]
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+class RouteSeries:
+    """Every series of one (method, route) pair, created on its first request"""
+
+    __slots__ = ("labels", "latency", "size", "queries", "statuses")
+
+    def __init__(self, method: str, route: str):
+        self.labels = f'method="{method}",route="{_escape(route)}"'
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.statuses: Dict[int, int] = {}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+class MetricsRegistry:
+    """
+    In-process request metrics
+
+    Updated only from the event loop thread, so no locking is needed.
+    Each worker process keeps its own registry; Prometheus aggregates
+    across scrape targets.
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.rejections: Dict[str, int] = {}
+        self._series: Dict[tuple, RouteSeries] = {}
+
+    def count_rejection(self, reason: str):
+        """Count a request turned away by admission control"""
+        self.rejections[reason] = self.rejections.get(reason, 0) + 1
+
+    def observe(self, method: str, route: str, status_code: int, seconds: float, size: int, queries: int):
+        series = self._series.get((method, route))
+        if series is None:
+            series = self._series[(method, route)] = RouteSeries(method, route)
+        series.latency.observe(seconds)
+        series.size.observe(size)
+        series.queries.observe(queries)
+        series.statuses[status_code] = series.statuses.get(status_code, 0) + 1
+
+    def render(self) -> str:
+        """Current values in Prometheus text exposition format 0.0.4"""
+        series = list(self._series.values())
+        lines = [
+            "# HELP http_requests_in_flight Requests currently being handled",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP http_requests_rejected_total Requests rejected by admission control",
+            "# TYPE http_requests_rejected_total counter",
+            *(f'http_requests_rejected_total{{reason="{reason}"}} {count}'
+              for reason, count in sorted(self.rejections.items())),
+            "# HELP http_responses_total Responses by route and status code",
+            "# TYPE http_responses_total counter",
+        ]
+        for route_series in series:
+            for status_code, count in sorted(route_series.statuses.items()):
+                lines.append(f'http_responses_total{{{route_series.labels},status="{status_code}"}} {count}')
+
+        lines += [
+            "# HELP http_request_duration_seconds Time from request start to last response byte",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for route_series in series:
+            lines += route_series.latency.render("http_request_duration_seconds", route_series.labels)
+
+        lines += [
+            "# HELP http_response_size_bytes Response body size",
+            "# TYPE http_response_size_bytes histogram",
+        ]
+        for route_series in series:
+            lines += route_series.size.render("http_response_size_bytes", route_series.labels)
+
+        lines += [
+            "# HELP db_queries_per_request SQL statements executed per request",
+            "# TYPE db_queries_per_request histogram",
+        ]
+        for route_series in series:
+            lines += route_series.queries.render("db_queries_per_request", route_series.labels)
+
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
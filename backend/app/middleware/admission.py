@@ -0,0 +1,71 @@
+# ASGI middleware rejecting excess requests before they reach a route
+from fastapi.responses import JSONResponse
+from app.metrics import MetricsRegistry
+from app.rate_limit import RateLimitBackend, retry_after_header
+from .auth import user_id_from_scope
+from typing import Optional
+
+# Long-lived or operational paths that are never limited
+EXEMPT_PREFIXES = ("/health", "/metrics")
+EXEMPT_SUFFIXES = ("/tasks/events",)
+
+
+class AdmissionControlMiddleware:
+    """
+    Shed load before it queues on the threadpool or the database pool
+
+    - Global: at most max_in_flight requests are handled at once; the rest
+      get an immediate 503 with Retry-After
+    - Per user: each JWT sub draws from a token bucket; an empty bucket
+      gets 429 with Retry-After
+    """
+
+    def __init__(
+        self,
+        app,
+        rate_limit: Optional[RateLimitBackend],
+        max_in_flight: int,
+        registry: Optional[MetricsRegistry] = None
+    ):
+        self.app = app
+        self.rate_limit = rate_limit
+        self.max_in_flight = max_in_flight
+        self.registry = registry
+        self.in_flight = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._exempt(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        if self.max_in_flight and self.in_flight >= self.max_in_flight:
+            await self._reject(scope, receive, send, 503, "Server is busy, retry shortly", 1.0, "overloaded")
+            return
+
+        if self.rate_limit is not None:
+            user_id = user_id_from_scope(scope)
+            if user_id is not None:
+                retry_after = await self.rate_limit.acquire(user_id)
+                if retry_after:
+                    await self._reject(scope, receive, send, 429, "Too many requests", retry_after, "rate_limited")
+                    return
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+    @staticmethod
+    def _exempt(path: str) -> bool:
+        return path.startswith(EXEMPT_PREFIXES) or path.endswith(EXEMPT_SUFFIXES)
+
+    async def _reject(self, scope, receive, send, status_code: int, detail: str, retry_after: float, reason: str):
+        if self.registry is not None:
+            self.registry.count_rejection(reason)
+        response = JSONResponse(
+            {"detail": detail},
+            status_code=status_code,
+            headers={"Retry-After": retry_after_header(retry_after)}
+        )
+        await response(scope, receive, send)
@@ -3,11 +3,24 @@ import jwt
 from fastapi import HTTPException
 from datetime import datetime
 from ..config import settings
+from .token_cache import TokenCache
+from typing import Optional
+
+
+# Verified payloads keyed by token digest; None when JWT_CACHE_ENABLED is off
+token_cache = (
+    TokenCache(settings.JWT_CACHE_MAX_ENTRIES, settings.JWT_CACHE_MAX_TTL_SECONDS)
+    if settings.JWT_CACHE_ENABLED
+    else None
+)
 
 
 def verify_jwt(token: str) -> dict:
     """
     Verify JWT token and return payload
+
+    Repeat calls with an already-verified, unexpired token are served
+    from token_cache without decoding or checking the signature again.
     
     Args:
         token: JWT token string
@@ -18,6 +31,11 @@ def verify_jwt(token: str) -> dict:
     Raises:
         HTTPException: 401 if token invalid or expired
     """
+    if token_cache is not None:
+        payload = token_cache.get(token)
+        if payload is not None:
+            return payload
+
     try:
         payload = jwt.decode(
             token,
@@ -33,6 +51,9 @@ def verify_jwt(token: str) -> dict:
                 detail="Token has expired"
             )
         
+        if token_cache is not None:
+            token_cache.put(token, payload)
+        
         return payload
         
     except jwt.InvalidTokenError:
@@ -47,6 +68,23 @@ def verify_jwt(token: str) -> dict:
         )
 
 
+def user_id_from_scope(scope) -> Optional[str]:
+    """
+    JWT sub of an ASGI request, resolved the same way as get_current_user
+
+    For middleware that runs before routing. Verified tokens come from the
+    token cache, so repeat callers cost a dict lookup. Missing or invalid
+    tokens return None and are left for the route to reject with 401.
+    """
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            try:
+                return verify_jwt(get_token_from_header(value.decode("latin-1"))).get("sub")
+            except HTTPException:
+                return None
+    return None
+
+
 def get_token_from_header(authorization: str) -> str:
     """
     Extract JWT token from Authorization header
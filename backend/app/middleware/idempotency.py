@@ -0,0 +1,197 @@
+# ASGI middleware honoring Idempotency-Key on mutating requests
+import asyncio
+import logging
+from datetime import datetime
+from fastapi.responses import JSONResponse, Response
+from app.config import settings
+from app.database import run_db, session_scope
+from app.idempotency import (
+    ResponseCache,
+    StoredResponse,
+    complete_key,
+    lease_deadline,
+    release_key,
+    renew_key,
+    request_fingerprint,
+    reserve_key,
+)
+from app.query_stats import request_queries
+from .auth import user_id_from_scope
+
+MUTATING_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+# Streamed uploads are not buffered for hashing, so they are not keyed
+EXCLUDED_SUFFIXES = ("/tasks/import",)
+
+MAX_KEY_LENGTH = 255
+
+logger = logging.getLogger(__name__)
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+async def _run_bookkeeping(fn, *args):
+    """Run fn in its own session, outside the request's query count and budget"""
+    token = request_queries.set(None)
+    try:
+        async with session_scope() as db:
+            return await run_db(db, fn, *args)
+    finally:
+        request_queries.reset(token)
+
+
+class IdempotencyMiddleware:
+    """
+    Replay the stored response when a keyed request is retried
+
+    The first request with a given (user, Idempotency-Key) claims the key
+    in idempotency_keys, runs normally, and its response is stored. A
+    retry with the same key and request gets that response back (with
+    Idempotent-Replayed: true) without the route running, so it never
+    touches the tasks table. The same key on a different request gets 422,
+    and a retry racing the still-running original gets 409.
+    Server errors (5xx) are not stored, so they can be retried.
+
+    A running request holds its key on a lease of IDEMPOTENCY_LEASE_SECONDS,
+    renewed every third of that. If its worker dies, the lease lapses and
+    the next retry runs the request instead of getting 409 until the TTL.
+    """
+
+    def __init__(self, app, cache: ResponseCache):
+        self.app = app
+        self.cache = cache
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in MUTATING_METHODS
+            or scope["path"].endswith(EXCLUDED_SUFFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        key = next((value.decode("latin-1") for name, value in scope["headers"] if name == b"idempotency-key"), None)
+        user_id = user_id_from_scope(scope) if key else None
+        if user_id is None:
+            # No key, or unauthenticated (the route answers 401)
+            await self.app(scope, receive, send)
+            return
+
+        if len(key) > MAX_KEY_LENGTH:
+            await JSONResponse(
+                {"detail": f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters"}, status_code=400
+            )(scope, receive, send)
+            return
+
+        body = await _read_body(receive)
+        request_hash = request_fingerprint(scope["method"], scope["path"], scope["query_string"], body)
+
+        stored = self.cache.get(user_id, key)
+        lease = lease_deadline()
+        if stored is None:
+            stored = await _run_bookkeeping(reserve_key, user_id, key, request_hash, lease)
+
+        if stored is not None:
+            await self._respond_stored(scope, receive, send, user_id, key, request_hash, stored)
+            return
+
+        await self._run_and_store(scope, receive, send, user_id, key, request_hash, body, lease)
+
+    async def _respond_stored(self, scope, receive, send, user_id, key, request_hash, stored: StoredResponse):
+        if stored.request_hash != request_hash:
+            response = JSONResponse(
+                {"detail": "Idempotency-Key was already used for a different request"}, status_code=422
+            )
+        elif stored.status_code is None:
+            # Taken over once the lease lapses if the original has died
+            retry_after = (stored.expires_at - datetime.utcnow()).total_seconds()
+            response = JSONResponse(
+                {"detail": "A request with this Idempotency-Key is still in progress"},
+                status_code=409,
+                headers={"Retry-After": str(max(1, min(int(retry_after) + 1, settings.IDEMPOTENCY_LEASE_SECONDS)))}
+            )
+        else:
+            self.cache.put(user_id, key, stored)
+            response = Response(
+                stored.body,
+                status_code=stored.status_code,
+                media_type=stored.content_type,
+                headers={"Idempotent-Replayed": "true"}
+            )
+        await response(scope, receive, send)
+
+    @staticmethod
+    async def _keep_leased(user_id: str, key: str, lease: list, done: asyncio.Event):
+        # Renews lease[0] in place until done is set or the key is lost.
+        # Stopped with an event rather than cancelled, so a renewal is
+        # never left running with its new lease unrecorded
+        interval = settings.IDEMPOTENCY_LEASE_SECONDS / 3
+        while True:
+            try:
+                await asyncio.wait_for(done.wait(), timeout=interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            new_lease = lease_deadline()
+            try:
+                renewed = await _run_bookkeeping(renew_key, user_id, key, lease[0], new_lease)
+            except Exception:
+                logger.warning("Could not renew Idempotency-Key lease", exc_info=True)
+                continue
+            if not renewed:
+                return
+            lease[0] = new_lease
+
+    async def _run_and_store(self, scope, receive, send, user_id, key, request_hash, body: bytes, lease):
+        body_sent = False
+        status_code = 500
+        content_type = None
+        chunks = []
+
+        async def replay_body():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        async def send_and_capture(message):
+            nonlocal status_code, content_type
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                content_type = next(
+                    (value.decode("latin-1") for name, value in message.get("headers", ()) if name == b"content-type"),
+                    None
+                )
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        completed = False
+        current_lease = [lease]
+        done = asyncio.Event()
+        heartbeat = asyncio.get_running_loop().create_task(self._keep_leased(user_id, key, current_lease, done))
+        try:
+            await self.app(scope, replay_body, send_and_capture)
+            completed = status_code < 500
+        finally:
+            done.set()
+            await heartbeat
+            if completed:
+                # expires_at is filled in from the record by complete_key
+                response = StoredResponse(request_hash, status_code, content_type, b"".join(chunks), None)
+                stored = await _run_bookkeeping(complete_key, user_id, key, current_lease[0], response)
+                if stored is not None:
+                    self.cache.put(user_id, key, stored)
+            else:
+                await _run_bookkeeping(release_key, user_id, key, current_lease[0])
@@ -0,0 +1,79 @@
+# ASGI middleware recording request metrics and Server-Timing headers
+from time import perf_counter
+from app.metrics import AUTH, DB, SERIALIZE, UNMATCHED_ROUTE, MetricsRegistry, request_timings
+from app.query_stats import QueryStats, check_query_budget, request_queries
+
+
+class MetricsMiddleware:
+    """
+    Record latency, status, response size and SQL statement count per
+    route template, and check each request against its query budget
+
+    Written as plain ASGI rather than BaseHTTPMiddleware, which would add a
+    task and a stream per request. Labels come from the matched route's
+    path template (e.g. /api/{user_id}/tasks), never the raw URL.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry, server_timing: bool = False):
+        self.app = app
+        self.registry = registry
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = perf_counter()
+        status_code = 500
+        size = 0
+        timings = [0.0, 0.0, 0.0] if self.server_timing else None
+        token = request_timings.set(timings) if timings is not None else None
+        queries = QueryStats()
+        queries_token = request_queries.set(queries)
+
+        async def send_with_metrics(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if timings is not None:
+                    message["headers"] = [
+                        *message.get("headers", ()),
+                        (b"server-timing", _server_timing(timings, queries, perf_counter() - start)),
+                    ]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        self.registry.in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            self.registry.in_flight -= 1
+            request_queries.reset(queries_token)
+            if token is not None:
+                request_timings.reset(token)
+
+            # The router stores the matched route in the (shared) scope
+            route = scope.get("route")
+            route_path = route.path if route is not None else UNMATCHED_ROUTE
+            self.registry.observe(
+                scope["method"],
+                route_path,
+                status_code,
+                perf_counter() - start,
+                size,
+                queries.count
+            )
+        check_query_budget(scope["method"], route_path, queries)
+
+
+def _server_timing(timings: list, queries: QueryStats, total: float) -> bytes:
+    # Durations in milliseconds, as the Server-Timing spec expects
+    return (
+        f"auth;dur={timings[AUTH] * 1000:.2f}, "
+        f'db;dur={timings[DB] * 1000:.2f};desc="{queries.count} queries", '
+        f"sql;dur={queries.seconds * 1000:.2f}, "
+        f"serialize;dur={timings[SERIALIZE] * 1000:.2f}, "
+        f"app;dur={total * 1000:.2f}"
+    ).encode()
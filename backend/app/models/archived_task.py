@@ -0,0 +1,33 @@
+# Completed tasks moved out of the hot tasks table
+from datetime import datetime
+from uuid import UUID
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+from typing import Optional
+
+
+class ArchivedTask(SQLModel, table=True):
+    """A task moved here by the archive job; same columns as Task plus archived_at"""
+    __tablename__ = "archived_tasks"
+    __table_args__ = (
+        # Backs the archived listing: WHERE user_id = ? ORDER BY archived_at DESC, id DESC
+        Index("ix_archived_tasks_user_id_archived_at_id", "user_id", "archived_at", "id"),
+        # Backs export with ?include_archived=true
+        Index("ix_archived_tasks_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
+
+    id: UUID = Field(primary_key=True)
+    user_id: str = Field(nullable=False)
+    title: str = Field(max_length=200, nullable=False)
+    description: Optional[str] = Field(default=None, max_length=1000)
+    completed: bool = Field(nullable=False)
+    created_at: datetime = Field(nullable=False)
+    updated_at: datetime = Field(nullable=False)
+    archived_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+
+
+# Same order as TASK_COLUMNS, so rows from either table format alike
+ARCHIVED_TASK_COLUMNS = (
+    ArchivedTask.id, ArchivedTask.user_id, ArchivedTask.title, ArchivedTask.description,
+    ArchivedTask.completed, ArchivedTask.created_at, ArchivedTask.updated_at
+)
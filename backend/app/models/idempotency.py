@@ -0,0 +1,26 @@
+# Stored responses for Idempotency-Key replays
+from datetime import datetime
+from sqlalchemy import Column, Index, LargeBinary
+from sqlmodel import Field, SQLModel
+from typing import Optional
+
+
+class IdempotencyRecord(SQLModel, table=True):
+    """The outcome of one keyed mutation, replayed to retries until expires_at"""
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        # Backs the per-user expiry sweep
+        Index("ix_idempotency_keys_user_id_expires_at", "user_id", "expires_at"),
+    )
+
+    user_id: str = Field(primary_key=True)
+    key: str = Field(primary_key=True, max_length=255)
+    request_hash: str = Field(nullable=False)
+    # None while the first request with this key is still running
+    status_code: Optional[int] = Field(default=None)
+    content_type: Optional[str] = Field(default=None)
+    body: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary))
+    # While running: the owner's lease, renewed as it runs and matched on
+    # every write so an owner whose lease lapsed cannot touch a retry's key.
+    # Once finished: when the stored response expires
+    expires_at: datetime = Field(nullable=False)
@@ -0,0 +1,10 @@
+# Per-user revision counter for conditional GETs
+from sqlmodel import Field, SQLModel
+
+
+class UserRevision(SQLModel, table=True):
+    """Monotonic counter bumped in the same transaction as every task write"""
+    __tablename__ = "user_revisions"
+
+    user_id: str = Field(primary_key=True)
+    revision: int = Field(default=0, nullable=False)
@@ -0,0 +1,12 @@
+# Fingerprint of the schema last applied to this database
+from datetime import datetime
+from sqlmodel import Field, SQLModel
+
+
+class SchemaVersion(SQLModel, table=True):
+    """Single row (id=1) recording which schema the database already has"""
+    __tablename__ = "schema_version"
+
+    id: int = Field(default=1, primary_key=True)
+    fingerprint: str = Field(nullable=False)
+    applied_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
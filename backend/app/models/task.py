@@ -1,6 +1,7 @@
 # Task P2-T-006: Define SQLModel Task Model
 from datetime import datetime
 from uuid import UUID, uuid4
+from sqlalchemy import Index, text
 from sqlmodel import Field, SQLModel
 from typing import Optional
 
@@ -8,6 +9,22 @@ from typing import Optional
 class Task(SQLModel, table=True):
     """Task model for database"""
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Backs keyset pagination: WHERE user_id = ? ORDER BY created_at, id
+        Index("ix_tasks_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Same, filtered by ?completed=
+        Index("ix_tasks_user_id_completed_created_at", "user_id", "completed", "created_at", "id"),
+        # Backs ?sort=updated_at
+        Index("ix_tasks_user_id_updated_at_id", "user_id", "updated_at", "id"),
+        # Backs ?sort=title
+        Index("ix_tasks_user_id_title_id", "user_id", "title", "id"),
+        # Archive candidates (completed, updated_at < cutoff); partial, so
+        # open tasks do not pay for it
+        Index(
+            "ix_tasks_completed_updated_at", "updated_at",
+            postgresql_where=text("completed"), sqlite_where=text("completed")
+        ),
+    )
     
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     user_id: str = Field(index=True, nullable=False)
@@ -16,3 +33,10 @@ class Task(SQLModel, table=True):
     completed: bool = Field(default=False, nullable=False)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+# Column list for Core-level SELECT/RETURNING that skip ORM object hydration
+TASK_COLUMNS = (
+    Task.id, Task.user_id, Task.title, Task.description,
+    Task.completed, Task.created_at, Task.updated_at
+)
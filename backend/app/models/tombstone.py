@@ -0,0 +1,18 @@
+# Deleted-task markers for delta sync
+from datetime import datetime
+from uuid import UUID
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+
+class TaskTombstone(SQLModel, table=True):
+    """Records a hard-deleted task so sync clients can drop their copy"""
+    __tablename__ = "task_tombstones"
+    __table_args__ = (
+        # Backs sync reads (deleted_at > since) and retention pruning
+        Index("ix_task_tombstones_user_id_deleted_at", "user_id", "deleted_at"),
+    )
+
+    task_id: UUID = Field(primary_key=True)
+    user_id: str = Field(nullable=False)
+    deleted_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
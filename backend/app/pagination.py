@@ -0,0 +1,54 @@
+# Keyset (cursor) pagination helpers for task listing
+import base64
+import json
+from datetime import datetime
+from uuid import UUID
+from fastapi import HTTPException, status
+from typing import Any, Tuple
+
+
+def encode_cursor(sort: str, value: Any, task_id: UUID) -> str:
+    """
+    Encode the sort key of the last row on a page into an opaque cursor
+
+    Args:
+        sort: Name of the column the page is sorted by
+        value: That column's value on the last task returned
+        task_id: id of the last task returned (tie-breaker)
+
+    Returns:
+        str: URL-safe cursor string
+    """
+    if isinstance(value, datetime):
+        value = {"dt": value.isoformat()}
+    raw = json.dumps([sort, value, str(task_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, UUID]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        cursor: Opaque cursor string from a previous page
+        sort: Sort column of the current request; must match the cursor's
+
+    Returns:
+        Tuple[Any, UUID]: (sort value, id) of the last row seen
+
+    Raises:
+        HTTPException: 400 if cursor is malformed or from a different sort
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, value, task_id = json.loads(base64.urlsafe_b64decode(padded))
+        if cursor_sort != sort:
+            raise ValueError("cursor sort mismatch")
+        if isinstance(value, dict):
+            value = datetime.fromisoformat(value["dt"])
+        return value, UUID(task_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
@@ -0,0 +1,93 @@
+# Connection pool instrumentation for the database engines
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool, QueuePool
+from typing import Type
+
+
+class PoolStats:
+    """Counters for one engine's pool, updated from any worker thread"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+        self.invalidations = 0
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            if seconds > self.wait_max:
+                self.wait_max = seconds
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def record_invalidation(self):
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self, pool: Pool) -> dict:
+        """
+        Current pool occupancy plus accumulated checkout timings
+
+        Args:
+            pool: The engine's live pool (engine.pool)
+
+        Returns:
+            dict: JSON-serializable pool report
+        """
+        report = {"pool": type(pool).__name__}
+
+        # Occupancy is only meaningful for queue-based pools
+        if isinstance(pool, QueuePool):
+            report.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+            })
+
+        with self._lock:
+            report.update({
+                "checkouts": self.checkouts,
+                "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "timeouts": self.timeouts,
+                "invalidations": self.invalidations,
+            })
+        return report
+
+
+def timed_pool_class(base: Type[Pool], stats: PoolStats) -> Type[Pool]:
+    """
+    Subclass a pool so every checkout records its wait time into stats
+
+    The subclass survives pool.recreate() (engine.dispose()), which
+    rebuilds the pool from self.__class__.
+    """
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = base._do_get(self)
+        except PoolTimeoutError:
+            stats.record_timeout()
+            raise
+        stats.record_wait(time.perf_counter() - start)
+        return connection
+
+    return type(f"Timed{base.__name__}", (base,), {"_do_get": _do_get})
+
+
+def attach_invalidation_counter(pool_or_engine, stats: PoolStats):
+    """Count connections discarded by pre-ping or disconnect errors"""
+    @event.listens_for(pool_or_engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        stats.record_invalidation()
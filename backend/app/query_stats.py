@@ -0,0 +1,112 @@
+# Per-request SQL counting, slow-query logging and query budgets
+import logging
+from contextvars import ContextVar
+from time import perf_counter
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.config import settings
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Longest statement text written to the slow-query log
+MAX_LOGGED_STATEMENT = 1000
+
+# Most statements each task route may run (SQLite/PostgreSQL, cold cache).
+# Checked after every request; see SQL_QUERY_BUDGET_STRICT.
+QUERY_BUDGETS: Dict[Tuple[str, str], int] = {
+    # INSERT + revision bump
+    ("POST", "/api/{user_id}/tasks"): 2,
+    # Revision + page SELECT
+    ("GET", "/api/{user_id}/tasks"): 2,
+    # Revision + task SELECT
+    ("GET", "/api/{user_id}/tasks/{task_id}"): 2,
+    # UPDATE ... RETURNING + revision bump (+1 SELECT on SQLite < 3.35)
+    ("PUT", "/api/{user_id}/tasks/{task_id}"): 3,
+    ("PATCH", "/api/{user_id}/tasks/{task_id}/complete"): 3,
+    # DELETE + tombstone INSERT + tombstone prune + revision bump
+    ("DELETE", "/api/{user_id}/tasks/{task_id}"): 4,
+}
+
+
+class QueryStats:
+    """Statements executed and time spent in them during one request"""
+
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A route ran more statements than its QUERY_BUDGETS entry allows"""
+
+
+# Set by the metrics middleware for the duration of each request. Context
+# variables follow run_db into the threadpool and into run_sync greenlets.
+request_queries: ContextVar[Optional[QueryStats]] = ContextVar("request_queries", default=None)
+
+
+def _redact(parameters) -> str:
+    # Never log values (titles, descriptions, user ids): only their shape
+    if isinstance(parameters, (list, tuple)) and parameters and isinstance(parameters[0], (list, tuple, dict)):
+        return f"<{len(parameters)} parameter sets>"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return "<none>"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = perf_counter() - conn.info["query_start"].pop()
+
+    stats = request_queries.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+
+    threshold = settings.SQL_SLOW_QUERY_MS
+    if threshold and elapsed * 1000 >= threshold:
+        logger.warning(
+            "Slow query (%.1f ms): %s params=%s",
+            elapsed * 1000,
+            " ".join(statement.split())[:MAX_LOGGED_STATEMENT],
+            _redact(parameters)
+        )
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    start_times = exception_context.connection.info.get("query_start") if exception_context.connection is not None else None
+    if start_times:
+        start_times.pop()
+
+
+def instrument_engine(engine: Engine):
+    """Count and time every statement executed through engine"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def check_query_budget(method: str, route: str, stats: QueryStats):
+    """
+    Compare a finished request against its route's budget
+
+    Over-budget requests are logged; with SQL_QUERY_BUDGET_STRICT (for test
+    and development runs) QueryBudgetExceeded is raised instead.
+    """
+    budget = QUERY_BUDGETS.get((method, route))
+    if budget is None or stats.count <= budget:
+        return
+
+    message = f"{method} {route} ran {stats.count} queries (budget {budget})"
+    if settings.SQL_QUERY_BUDGET_STRICT:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
@@ -0,0 +1,104 @@
+# Per-user token buckets for admission control
+import importlib
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+from .config import settings
+
+
+class RateLimitBackend(ABC):
+    """
+    Storage interface for per-user token buckets
+
+    The in-memory backend limits each worker process separately; a shared
+    implementation (e.g. Redis) makes the limit apply across workers.
+    """
+
+    @abstractmethod
+    async def acquire(self, user_id: str) -> float:
+        """
+        Take one token from user_id's bucket
+
+        Returns:
+            float: 0 if the request is admitted, otherwise seconds until a
+                token will be available
+        """
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """JSON-serializable counters"""
+
+
+class MemoryRateLimit(RateLimitBackend):
+    """In-process token buckets, bounded by tracked user count"""
+
+    def __init__(self, rate: float, burst: int, max_users: int):
+        self.rate = rate
+        self.burst = burst
+        self.max_users = max_users
+        # user_id -> [tokens, last refill time]; least recently seen first
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def acquire(self, user_id: str) -> float:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(user_id)
+            if bucket is None:
+                bucket = self._buckets[user_id] = [float(self.burst), now]
+                # An evicted user just starts again with a full bucket
+                while len(self._buckets) > self.max_users:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(user_id)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return (1 - bucket[0]) / self.rate
+
+    def stats(self) -> dict:
+        return {
+            "backend": "memory",
+            "users": len(self._buckets),
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+        }
+
+
+def retry_after_header(seconds: float) -> str:
+    """Retry-After value: whole seconds, at least 1"""
+    return str(max(1, math.ceil(seconds)))
+
+
+def build_rate_limit(backend: str) -> Optional[RateLimitBackend]:
+    """
+    Create the configured rate limit backend
+
+    Args:
+        backend: "memory", "none", or "package.module:ClassName" for a
+            shared RateLimitBackend implementation (constructed with no args)
+
+    Returns:
+        Optional[RateLimitBackend]: None when per-user limiting is disabled
+    """
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return MemoryRateLimit(
+            rate=settings.RATE_LIMIT_PER_SECOND,
+            burst=settings.RATE_LIMIT_BURST,
+            max_users=settings.RATE_LIMIT_MAX_USERS
+        )
+
+    module_name, _, class_name = backend.partition(":")
+    backend_class = getattr(importlib.import_module(module_name), class_name)
+    return backend_class()
+
+
+rate_limit = build_rate_limit(settings.RATE_LIMIT_BACKEND)
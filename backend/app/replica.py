@@ -0,0 +1,157 @@
+# Read replica routing: health, lag and read-your-writes pins
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+from typing import Callable, Optional
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds the replica is behind the primary; 0 when it has replayed
+# everything it received (an idle primary does not make it "lag")
+POSTGRES_LAG_SQL = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+    " END"
+)
+
+
+def measure_lag(connection) -> float:
+    """Replication lag in seconds seen from a replica connection"""
+    if connection.dialect.name == "postgresql":
+        return float(connection.execute(POSTGRES_LAG_SQL).scalar() or 0)
+    # Other databases (e.g. a SQLite file in development) only get a liveness check
+    connection.execute(text("SELECT 1"))
+    return 0.0
+
+
+class ReadRouter:
+    """
+    Decide per request whether a user's reads may go to the replica
+
+    Reads use the primary while the replica is unhealthy or lagging more
+    than max_lag. Otherwise read-your-writes is decided per request by
+    comparing the user's revision on both (see app.database.replica_caught_up),
+    which holds whichever worker took the write. The worker that took it
+    also pins the user to the primary for pin_seconds, which skips that
+    comparison while the replica is most likely still behind.
+    """
+
+    def __init__(self, enabled: bool, pin_seconds: float, max_lag: float, max_pins: int = 100000):
+        self.enabled = enabled
+        self.pin_seconds = pin_seconds
+        self.max_lag = max_lag
+        self.max_pins = max_pins
+        # user_id -> monotonic time the pin ends; oldest pin first
+        self._pins: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Unknown until the first check, so the primary serves until then
+        self.healthy = False
+        self.lag: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.checked_at: Optional[float] = None
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.behind_reads = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def pin(self, user_id: str):
+        """Route user_id's reads to the primary for the next pin_seconds"""
+        if not self.enabled or self.pin_seconds <= 0:
+            return
+        with self._lock:
+            self._pins[user_id] = time.monotonic() + self.pin_seconds
+            self._pins.move_to_end(user_id)
+            while len(self._pins) > self.max_pins:
+                self._pins.popitem(last=False)
+
+    def _pinned(self, user_id: str) -> bool:
+        with self._lock:
+            until = self._pins.get(user_id)
+            if until is None:
+                return False
+            if until > time.monotonic():
+                return True
+            del self._pins[user_id]
+            return False
+
+    def use_replica(self, user_id: str) -> bool:
+        """
+        True if user_id's reads may be served by the replica right now,
+        provided it has the user's latest revision (checked by the caller)
+        """
+        return (
+            self.enabled
+            and self.healthy
+            and self.lag is not None
+            and self.lag <= self.max_lag
+            and not self._pinned(user_id)
+        )
+
+    def record_read(self, replica: bool, behind: bool = False):
+        """Count a routed read; behind means the replica lacked the user's writes"""
+        if replica:
+            self.replica_reads += 1
+        else:
+            self.primary_reads += 1
+        if behind:
+            self.behind_reads += 1
+
+    def record_check(self, lag: Optional[float], error: Optional[str] = None):
+        was_usable = self.healthy and self.lag is not None and self.lag <= self.max_lag
+        self.healthy = error is None
+        self.lag = lag
+        self.last_error = error
+        self.checked_at = time.time()
+        usable = self.healthy and lag is not None and lag <= self.max_lag
+        if usable != was_usable:
+            if usable:
+                logger.info("Read replica in use (lag %.2fs)", lag)
+            else:
+                logger.warning("Read replica bypassed: %s", error or f"lag {lag:.2f}s")
+
+    async def _monitor(self, check: Callable[[], float], interval: float):
+        while True:
+            try:
+                lag = await run_in_threadpool(check)
+                self.record_check(lag)
+            except Exception as exc:
+                self.record_check(None, f"{type(exc).__name__}: {exc}")
+            await asyncio.sleep(interval)
+
+    def start(self, check: Callable[[], float], interval: float):
+        """Check replica health and lag every interval seconds (call on startup)"""
+        if self.enabled and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._monitor(check, interval))
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "healthy": self.healthy,
+            "lag_seconds": round(self.lag, 3) if self.lag is not None else None,
+            "max_lag_seconds": self.max_lag,
+            "last_error": self.last_error,
+            "checked_at": self.checked_at,
+            "pinned_users": len(self._pins),
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "behind_reads": self.behind_reads,
+        }
+
+
+read_router = ReadRouter(
+    enabled=bool(settings.READ_DATABASE_URL),
+    pin_seconds=settings.READ_REPLICA_PIN_SECONDS,
+    max_lag=settings.READ_REPLICA_MAX_LAG_SECONDS
+)
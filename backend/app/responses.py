@@ -0,0 +1,59 @@
+# Fast JSON rendering for task payloads read straight from the database
+import json
+from datetime import datetime
+from time import perf_counter
+from uuid import UUID
+from fastapi.responses import JSONResponse
+from typing import Any
+from app.metrics import SERIALIZE, add_timing
+from app.schemas.task import TaskResponse
+
+try:
+    import orjson
+except ImportError:  # Optional: stdlib json is used when orjson is absent
+    orjson = None
+
+
+# Output key order of TaskResponse, so fast-path JSON matches the
+# response_model documented in OpenAPI field for field
+TASK_RESPONSE_FIELDS = tuple(TaskResponse.model_fields)
+
+
+def task_dict(row) -> dict:
+    """Map a TASK_COLUMNS row (or dict) to a TaskResponse-shaped dict"""
+    mapping = row if isinstance(row, dict) else row._mapping
+    return {field: mapping[field] for field in TASK_RESPONSE_FIELDS}
+
+
+def _default(value: Any):
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize dicts/lists of UUID, datetime and JSON-native values"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response for data that is already in response shape
+
+    Returning it from a route skips FastAPI's response_model validation
+    and jsonable_encoder pass; it is meant for rows we just read from our
+    own database, where re-validating adds nothing.
+    """
+
+    def render(self, content: Any) -> bytes:
+        # Pre-rendered bodies (e.g. cached pages) pass straight through
+        if isinstance(content, bytes):
+            return content
+        start = perf_counter()
+        body = dumps(content)
+        add_timing(SERIALIZE, perf_counter() - start)
+        return body
@@ -0,0 +1,64 @@
+# Per-user revision tracking and ETag helpers
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select, update
+from app.models.revision import UserRevision
+from typing import Optional
+
+
+def bump_revision(db: Session, user_id: str):
+    """
+    Increment the user's revision inside the caller's transaction
+
+    Must run before the caller commits so the new revision becomes
+    visible atomically with the task change it describes.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        statement = insert(UserRevision).values(user_id=user_id, revision=1).on_conflict_do_update(
+            index_elements=[UserRevision.user_id],
+            set_={"revision": UserRevision.revision + 1}
+        )
+        db.exec(statement)
+        return
+
+    # Generic fallback: UPDATE, then INSERT the first revision
+    statement = (
+        update(UserRevision)
+        .where(UserRevision.user_id == user_id)
+        .values(revision=UserRevision.revision + 1)
+    )
+    if not db.exec(statement).rowcount:
+        db.add(UserRevision(user_id=user_id, revision=1))
+        db.flush()
+
+
+def get_revision(db: Session, user_id: str) -> int:
+    """Current revision for user (0 if the user has never written)"""
+    statement = select(UserRevision.revision).where(UserRevision.user_id == user_id)
+    return db.exec(statement).first() or 0
+
+
+def make_etag(revision: int) -> str:
+    """Strong ETag for any representation derived from one user revision"""
+    return f'"r{revision}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of an If-None-Match header against etag
+
+    Accepts '*', comma-separated lists and W/ prefixed validators.
+    """
+    if not if_none_match:
+        return False
+
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
@@ -1,4 +1,11 @@
 # P2-T-011: Routes package
+from app.routes.archive import router as archive_router
+from app.routes.batch import router as batch_router
+from app.routes.events import router as events_router
+from app.routes.export import router as export_router
+from app.routes.imports import router as import_router
+from app.routes.stats import router as stats_router
+from app.routes.sync import router as sync_router
 from app.routes.tasks import router as tasks_router
 
-__all__ = ["tasks_router"]
+__all__ = ["archive_router", "batch_router", "events_router", "export_router", "import_router", "stats_router", "sync_router", "tasks_router"]
@@ -0,0 +1,78 @@
+# Read access to archived tasks (see app/archive.py)
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlmodel import Session, and_, or_, select
+from app.cache import read_through
+from app.config import settings
+from app.database import get_read_session, run_db
+from app.dependencies import get_current_user
+from app.models.archived_task import ARCHIVED_TASK_COLUMNS, ArchivedTask
+from app.pagination import decode_cursor, encode_cursor
+from app.responses import FastJSONResponse, dumps, task_dict
+from app.revisions import etag_matches, get_revision, make_etag
+from app.schemas.task import ArchivedTaskResponse
+from typing import List, Optional, Tuple
+
+router = APIRouter()
+
+
+def _render_archived_page(db: Session, user_id: str, page_size: int, after: Optional[tuple]) -> Tuple[bytes, Optional[str]]:
+    # Most recently archived first, seeking past the previous page's last row
+    statement = select(*ARCHIVED_TASK_COLUMNS, ArchivedTask.archived_at).where(ArchivedTask.user_id == user_id)
+    if after:
+        after_value, after_id = after
+        statement = statement.where(or_(
+            ArchivedTask.archived_at < after_value,
+            and_(ArchivedTask.archived_at == after_value, ArchivedTask.id < after_id)
+        ))
+    statement = statement.order_by(ArchivedTask.archived_at.desc(), ArchivedTask.id.desc()).limit(page_size + 1)
+    rows = db.exec(statement).all()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor("archived_at", rows[-1].archived_at, rows[-1].id)
+
+    return dumps([{**task_dict(row), "archived_at": row.archived_at} for row in rows]), next_cursor
+
+
+@router.get("/api/{user_id}/tasks/archived", response_model=List[ArchivedTaskResponse])
+async def list_archived_tasks(
+    user_id: str,
+    limit: Optional[int] = Query(None, ge=1, le=settings.TASKS_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_session),
+    current_user_id: str = Depends(get_current_user)
+):
+    """
+    List the authenticated user's archived tasks, most recently archived first
+    - Validates URL user_id matches JWT user_id
+    - Archived tasks are completed tasks the archive job moved out of the
+      task list; they are read-only here
+    - Paginated like the task list: pass X-Next-Cursor back as ?cursor=
+    """
+    # Verify user_id in URL matches authenticated user
+    if user_id != current_user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Cannot access other users' tasks"
+        )
+
+    # Archiving bumps the revision, so it validates this listing too
+    revision = await run_db(db, get_revision, current_user_id)
+    etag = make_etag(revision)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    page_size = limit or settings.TASKS_PAGE_DEFAULT_LIMIT
+    after = decode_cursor(cursor, "archived_at") if cursor else None
+    body, next_cursor = await read_through(
+        db, current_user_id, ("archived", page_size, cursor), revision,
+        _render_archived_page, current_user_id, page_size, after
+    )
+
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+
+    return FastJSONResponse(body, headers=headers)
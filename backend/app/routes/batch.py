@@ -0,0 +1,194 @@
+# Batch task mutations: many create/update/delete/toggle operations, one transaction
+from datetime import datetime
+from uuid import UUID, uuid4
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import bindparam
+from sqlmodel import Session, delete, insert, not_, select, update
+from app.cache import invalidate_user_cache
+from app.config import settings
+from app.database import get_session, run_db
+from app.dependencies import get_current_user
+from app.events import RESYNC_EVENT, task_events
+from app.models.task import TASK_COLUMNS, Task
+from app.revisions import bump_revision
+from app.schemas.task import TaskBatchRequest, TaskBatchResponse, TaskBatchResult
+from app.tombstones import record_tombstones
+from typing import Dict, List, Tuple
+
+router = APIRouter()
+
+
+def _write_changes(db: Session, user_id: str, tasks: Dict[UUID, dict], changed: Dict[UUID, None],
+                   assigned: Dict[UUID, dict], flipped: Dict[UUID, bool]):
+    """
+    UPDATE only the columns the batch touched, one executemany per shape
+
+    A task whose completed was only toggled (an odd number of times) gets
+    completed = NOT completed in SQL, like the single-task toggle, so a
+    concurrent write to the row is never overwritten with batch-time values.
+    """
+    shapes: Dict[Tuple[tuple, bool], list] = {}
+    for task_id in changed:
+        values = {**assigned.get(task_id, {}), "updated_at": tasks[task_id]["updated_at"]}
+        toggle = flipped.get(task_id, False) and "completed" not in values
+        params = {f"v_{column}": value for column, value in values.items()}
+        shapes.setdefault((tuple(sorted(values)), toggle), []).append({"v_id": task_id, **params})
+
+    for (columns, toggle), params in shapes.items():
+        values = {column: bindparam(f"v_{column}") for column in columns}
+        if toggle:
+            values["completed"] = not_(Task.completed)
+        statement = update(Task).where(Task.id == bindparam("v_id"), Task.user_id == user_id).values(values)
+        db.connection().execute(statement, params)
+
+
+def _delete_existing(db: Session, user_id: str, task_ids: List[UUID]) -> List[UUID]:
+    # Returns the ids actually deleted, so a task another request deleted
+    # meanwhile does not get a second tombstone
+    statement = delete(Task).where(Task.user_id == user_id, Task.id.in_(task_ids))
+    if db.get_bind().dialect.delete_returning:
+        return list(db.exec(statement.returning(Task.id)).scalars())
+    existing = list(db.exec(select(Task.id).where(Task.user_id == user_id, Task.id.in_(task_ids))))
+    db.exec(statement)
+    return existing
+
+
+def _apply_batch(db: Session, user_id: str, operations: list) -> List[TaskBatchResult]:
+    """
+    Apply operations in order against an in-memory view of the user's tasks,
+    then write the net effect with one INSERT, one UPDATE per set of touched
+    columns and one DELETE statement and a single commit.
+
+    On Postgres the referenced rows are locked for the transaction, so the
+    view (and the tasks in the results) cannot be changed underneath it.
+    Elsewhere, writes still touch only what the batch changed.
+    """
+    # Load every referenced task the user owns with one SELECT
+    referenced = {operation.id for operation in operations if operation.op != "create"}
+    tasks: Dict[UUID, dict] = {}
+    if referenced:
+        statement = select(*TASK_COLUMNS).where(Task.user_id == user_id, Task.id.in_(referenced))
+        if db.get_bind().dialect.name == "postgresql":
+            statement = statement.with_for_update()
+        tasks = {row.id: row._asdict() for row in db.exec(statement)}
+
+    # Insertion-ordered sets of ids to write back
+    created: Dict[UUID, None] = {}
+    changed: Dict[UUID, None] = {}
+    deleted: Dict[UUID, None] = {}
+    # Per changed task: columns set by updates, and whether toggles since
+    # then leave completed flipped
+    assigned: Dict[UUID, dict] = {}
+    flipped: Dict[UUID, bool] = {}
+    results: List[TaskBatchResult] = []
+
+    for index, operation in enumerate(operations):
+        now = datetime.utcnow()
+
+        if operation.op == "create":
+            task = {
+                "id": uuid4(),
+                "user_id": user_id,
+                "title": operation.data.title,
+                "description": operation.data.description,
+                "completed": False,
+                "created_at": now,
+                "updated_at": now,
+            }
+            tasks[task["id"]] = task
+            created[task["id"]] = None
+            results.append(TaskBatchResult(index=index, op=operation.op, status=status.HTTP_201_CREATED, task=dict(task)))
+            continue
+
+        task = tasks.get(operation.id)
+        if task is None:
+            results.append(TaskBatchResult(index=index, op=operation.op, status=status.HTTP_404_NOT_FOUND, error="Task not found"))
+            continue
+
+        if operation.op == "delete":
+            del tasks[operation.id]
+            if operation.id in created:
+                # Created and deleted in the same batch: never written
+                del created[operation.id]
+            else:
+                changed.pop(operation.id, None)
+                assigned.pop(operation.id, None)
+                flipped.pop(operation.id, None)
+                deleted[operation.id] = None
+            results.append(TaskBatchResult(index=index, op=operation.op, status=status.HTTP_204_NO_CONTENT))
+            continue
+
+        if operation.op == "update":
+            values = operation.data.model_dump(exclude_unset=True)
+            task.update(values)
+            if operation.id not in created:
+                assigned.setdefault(operation.id, {}).update(values)
+        else:
+            task["completed"] = not task["completed"]
+            if operation.id in assigned and "completed" in assigned[operation.id]:
+                assigned[operation.id]["completed"] = task["completed"]
+            elif operation.id not in created:
+                flipped[operation.id] = not flipped.get(operation.id, False)
+        task["updated_at"] = now
+
+        if operation.id not in created:
+            changed[operation.id] = None
+        results.append(TaskBatchResult(index=index, op=operation.op, status=status.HTTP_200_OK, task=dict(task)))
+
+    if created:
+        db.exec(insert(Task), params=[tasks[task_id] for task_id in created])
+    if changed:
+        _write_changes(db, user_id, tasks, changed, assigned, flipped)
+    if deleted:
+        record_tombstones(db, user_id, _delete_existing(db, user_id, list(deleted)))
+    if created or changed or deleted:
+        bump_revision(db, user_id)
+    db.commit()
+    if created or changed or deleted:
+        invalidate_user_cache(user_id)
+
+    return results
+
+
+async def _publish_results(user_id: str, operations: list, results: List[TaskBatchResult]):
+    events = []
+    for result in results:
+        if result.status == status.HTTP_201_CREATED:
+            events.append(("task.created", result.task.model_dump()))
+        elif result.status == status.HTTP_200_OK:
+            events.append(("task.updated", result.task.model_dump()))
+        elif result.status == status.HTTP_204_NO_CONTENT:
+            events.append(("task.deleted", {"id": operations[result.index].id}))
+
+    # A batch larger than a subscriber queue would overflow it anyway
+    if len(events) > settings.TASK_EVENTS_QUEUE_SIZE:
+        await task_events.publish(user_id, RESYNC_EVENT, {})
+        return
+    for event, data in events:
+        await task_events.publish(user_id, event, data)
+
+
+@router.post("/api/{user_id}/tasks/batch", response_model=TaskBatchResponse)
+async def batch_tasks(
+    user_id: str,
+    batch: TaskBatchRequest,
+    db: Session = Depends(get_session),
+    current_user_id: str = Depends(get_current_user)
+):
+    """
+    Apply a list of task operations in a single transaction
+    - Validates URL user_id matches JWT user_id
+    - Operations run in order; missing/foreign task IDs yield a per-operation 404
+    - Returns one result per operation, in request order
+    """
+    # Verify user_id in URL matches authenticated user
+    if user_id != current_user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Cannot modify other users' tasks"
+        )
+
+    results = await run_db(db, _apply_batch, current_user_id, batch.operations)
+    await _publish_results(current_user_id, batch.operations, results)
+
+    return TaskBatchResponse(results=results)
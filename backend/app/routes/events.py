@@ -0,0 +1,80 @@
+# Server-Sent Events stream of a user's task changes
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+from app.config import settings
+from app.dependencies import get_current_user
+from app.events import Subscription, task_events
+from typing import AsyncIterator
+
+router = APIRouter()
+
+
+class EventStreamResponse(StreamingResponse):
+    """Streams a subscription and always releases it when the response ends"""
+
+    def __init__(self, subscription: Subscription, **kwargs):
+        self.subscription = subscription
+        super().__init__(_stream(subscription), **kwargs)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            # A client that disconnects before the first chunk cancels the
+            # stream before the generator starts, so its finally never runs
+            task_events.unsubscribe(self.subscription)
+
+
+async def _stream(subscription: Subscription) -> AsyncIterator[str]:
+    try:
+        # Client reconnect delay (ms) if the connection drops
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                yield await asyncio.wait_for(
+                    subscription.queue.get(), timeout=settings.TASK_EVENTS_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                # Comment line keeps idle connections open through proxies
+                yield ": keep-alive\n\n"
+    finally:
+        # Runs when the client disconnects and the stream is cancelled
+        task_events.unsubscribe(subscription)
+
+
+@router.get("/api/{user_id}/tasks/events")
+async def task_event_stream(
+    user_id: str,
+    current_user_id: str = Depends(get_current_user)
+):
+    """
+    Stream the authenticated user's task changes as Server-Sent Events
+    - Validates URL user_id matches JWT user_id
+    - Events: task.created / task.updated (data: task), task.deleted
+      (data: {"id"}), and resync (data: {}) when events may have been missed
+    - On resync or reconnect, catch up with GET /api/{user_id}/tasks/sync
+    - Returns 429 past TASK_EVENTS_MAX_CONNECTIONS_PER_USER open streams
+    """
+    # Verify user_id in URL matches authenticated user
+    if user_id != current_user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Cannot access other users' tasks"
+        )
+
+    # Take the slot now, not when the stream starts, so concurrent connects
+    # are counted against the limit
+    subscription = task_events.subscribe(current_user_id, settings.TASK_EVENTS_MAX_CONNECTIONS_PER_USER)
+    if subscription is None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many open event streams"
+        )
+
+    return EventStreamResponse(
+        subscription,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,125 @@
+# Streaming export of a user's tasks as NDJSON or CSV
+import csv
+import io
+import json
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session, select
+from app.config import settings
+from app.database import async_read_engine_for, read_engine_for
+from app.dependencies import get_current_user
+from app.models.archived_task import ARCHIVED_TASK_COLUMNS, ArchivedTask
+from app.models.task import TASK_COLUMNS, Task
+from typing import AsyncIterator, Iterator, List, Literal
+
+router = APIRouter()
+
+EXPORT_FIELDS = [column.key for column in TASK_COLUMNS]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _export_statements(user_id: str, include_archived: bool) -> list:
+    # Server-side cursor: rows arrive in yield_per batches instead of all at once.
+    # Archived tasks follow the live ones, in the same columns.
+    tables = [(Task, TASK_COLUMNS)]
+    if include_archived:
+        tables.append((ArchivedTask, ARCHIVED_TASK_COLUMNS))
+    return [
+        select(*columns)
+        .where(model.user_id == user_id)
+        .order_by(model.created_at, model.id)
+        .execution_options(stream_results=True, yield_per=settings.TASKS_EXPORT_BATCH_SIZE)
+        for model, columns in tables
+    ]
+
+
+def _plain_values(row) -> list:
+    # UUIDs and datetimes as strings; everything else is already JSON-native
+    return [
+        str(row.id), row.user_id, row.title, row.description, row.completed,
+        row.created_at.isoformat(), row.updated_at.isoformat()
+    ]
+
+
+def _format_batch(rows: List, export_format: str) -> str:
+    if export_format == "ndjson":
+        return "".join(
+            json.dumps(dict(zip(EXPORT_FIELDS, _plain_values(row))), separators=(",", ":")) + "\n"
+            for row in rows
+        )
+
+    # CSV booleans as true/false, matching the NDJSON output
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        [*values[:4], "true" if values[4] else "false", *values[5:]]
+        for values in map(_plain_values, rows)
+    )
+    return buffer.getvalue()
+
+
+def _header(export_format: str) -> str:
+    if export_format == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(EXPORT_FIELDS)
+        return buffer.getvalue()
+    return ""
+
+
+def _stream_sync(user_id: str, export_format: str, include_archived: bool) -> Iterator[str]:
+    # The request's session dependency is closed before the body is sent,
+    # so the stream owns its own session for its whole lifetime
+    yield _header(export_format)
+    with Session(read_engine_for(user_id)) as db:
+        for statement in _export_statements(user_id, include_archived):
+            result = db.exec(statement)
+            for rows in result.partitions():
+                yield _format_batch(rows, export_format)
+
+
+async def _stream_async(user_id: str, export_format: str, include_archived: bool) -> AsyncIterator[str]:
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    yield _header(export_format)
+    async with AsyncSession(await async_read_engine_for(user_id)) as db:
+        for statement in _export_statements(user_id, include_archived):
+            result = await db.stream(statement)
+            async for rows in result.partitions():
+                yield _format_batch(rows, export_format)
+
+
+@router.get("/api/{user_id}/tasks/export")
+async def export_tasks(
+    user_id: str,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    include_archived: bool = False,
+    current_user_id: str = Depends(get_current_user)
+):
+    """
+    Stream every task owned by the authenticated user
+    - Validates URL user_id matches JWT user_id
+    - format=ndjson (one JSON object per line) or format=csv (with header row)
+    - include_archived=true appends archived tasks after the live ones
+    - Rows are read in batches through a server-side cursor, so memory use
+      does not grow with the number of tasks
+    """
+    # Verify user_id in URL matches authenticated user
+    if user_id != current_user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Cannot export other users' tasks"
+        )
+
+    if settings.DB_ASYNC:
+        body = _stream_async(current_user_id, format, include_archived)
+    else:
+        body = _stream_sync(current_user_id, format, include_archived)
+
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format}"'}
+    )
@@ -0,0 +1,338 @@
+# Streaming bulk import of tasks from NDJSON or CSV
+import codecs
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from uuid import uuid4
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from pydantic import ValidationError
+from sqlmodel import Session, insert
+from app.cache import invalidate_user_cache
+from app.config import settings
+from app.database import get_session, run_db
+from app.dependencies import get_current_user
+from app.events import RESYNC_EVENT, task_events
+from app.models.task import Task
+from app.revisions import bump_revision
+from app.schemas.task import TaskImport, TaskImportError, TaskImportResponse
+from typing import AsyncIterator, List, Literal, Optional, Tuple
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Longest accepted input line; anything longer is reported and skipped
+# so one malformed row cannot make the request buffer grow without bound
+MAX_LINE_CHARS = 16384
+# A quoted CSV field may span lines, but a record longer than this many
+# lines (or MAX_LINE_CHARS in total) is reported as unterminated
+MAX_RECORD_LINES = 100
+
+COPY_COLUMNS = ("id", "user_id", "title", "description", "completed", "created_at", "updated_at")
+
+
+async def _iter_lines(request: Request) -> AsyncIterator[Tuple[int, Optional[str]]]:
+    """
+    Yield (line number, text) for each line of the request body as it
+    arrives; text is None for a line that exceeded MAX_LINE_CHARS
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    line_number = 0
+    skipping = False
+
+    async for chunk in request.stream():
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            line_number += 1
+            if skipping:
+                # Tail of an oversized line already reported
+                skipping = False
+                continue
+            yield line_number, line.rstrip("\r")
+
+        if len(pending) > MAX_LINE_CHARS:
+            if not skipping:
+                yield line_number + 1, None
+            skipping = True
+            pending = ""
+
+    pending += decoder.decode(b"", final=True)
+    if pending and not skipping:
+        yield line_number + 1, pending.rstrip("\r")
+
+
+def _ends_in_quotes(line: str, in_quotes: bool) -> bool:
+    """
+    Whether a CSV record is inside a quoted field at the end of line
+
+    Follows csv.reader's default dialect: a quote opens a quoted field only
+    at the start of a field, so an unquoted field like 2" screws is plain
+    text; inside a quoted field "" is an escaped quote.
+    """
+    if '"' not in line:
+        return in_quotes
+    at_field_start = not in_quotes
+    index = 0
+    while index < len(line):
+        char = line[index]
+        if in_quotes:
+            if char == '"':
+                if line.startswith('"', index + 1):
+                    index += 2
+                    continue
+                in_quotes = False
+        elif char == '"' and at_field_start:
+            in_quotes = True
+        at_field_start = not in_quotes and char == ","
+        index += 1
+    return in_quotes
+
+
+class _CsvRecords:
+    """
+    Assemble physical lines into CSV records
+
+    feed() and close() return (line number, raw record) pairs like
+    _iter_records. Only the lines of one open record are buffered, and at
+    most MAX_RECORD_LINES of them: a record that never closes is reported
+    at its first line and the lines after it are parsed again as new
+    records, so one stray quote costs one row.
+    """
+
+    def __init__(self):
+        self.header: Optional[List[str]] = None
+        self.lines: List[Tuple[int, str]] = []
+        self.chars = 0
+        self.in_quotes = False
+
+    def feed(self, line_number: int, line: str) -> List[Tuple[int, object]]:
+        records = []
+        pending = [(line_number, line)]
+        while pending:
+            line_number, line = pending.pop(0)
+            self.lines.append((line_number, line))
+            self.chars += len(line)
+            self.in_quotes = _ends_in_quotes(line, self.in_quotes)
+            if not self.in_quotes:
+                records.extend(self._parse())
+            elif len(self.lines) > MAX_RECORD_LINES or self.chars > MAX_LINE_CHARS:
+                records.append(self._unterminated(pending))
+        return records
+
+    def close(self) -> List[Tuple[int, object]]:
+        records = []
+        while self.lines:
+            pending: List[Tuple[int, str]] = []
+            records.append(self._unterminated(pending))
+            for line_number, line in pending:
+                records.extend(self.feed(line_number, line))
+        return records
+
+    def _unterminated(self, pending: List[Tuple[int, str]]) -> Tuple[int, str]:
+        # Resume at the line after the record's first one
+        start = self.lines[0][0]
+        pending[:0] = self.lines[1:]
+        self._reset()
+        return start, "Unterminated quoted field"
+
+    def _reset(self):
+        self.lines = []
+        self.chars = 0
+        self.in_quotes = False
+
+    def _parse(self) -> List[Tuple[int, object]]:
+        record_start = self.lines[0][0]
+        text = "\n".join(line for _, line in self.lines)
+        self._reset()
+        if not text.strip():
+            return []
+
+        try:
+            values = next(csv.reader([text]))
+        except csv.Error as e:
+            if self.header is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid CSV header: {e}"
+                )
+            return [(record_start, f"Invalid CSV: {e}")]
+
+        if self.header is None:
+            self.header = [name.strip() for name in values]
+            if "title" not in self.header:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="CSV header must include a 'title' column"
+                )
+            return []
+
+        # Empty cells mean "not provided" so defaults apply
+        return [(record_start, {name: value for name, value in zip(self.header, values) if value != ""})]
+
+
+async def _iter_records(request: Request, import_format: str) -> AsyncIterator[Tuple[int, object]]:
+    """
+    Yield (line number, raw record) pairs: a dict for valid JSON/CSV rows,
+    or an error string for rows that could not be parsed
+    """
+    csv_records = _CsvRecords()
+
+    async for line_number, line in _iter_lines(request):
+        if line is None:
+            yield line_number, f"Line exceeds {MAX_LINE_CHARS} characters"
+            continue
+
+        if import_format == "ndjson":
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_number, f"Invalid JSON: {e}"
+                continue
+            yield line_number, record if isinstance(record, dict) else "Expected a JSON object"
+            continue
+
+        for record in csv_records.feed(line_number, line):
+            yield record
+
+    for record in csv_records.close():
+        yield record
+
+
+def _copy_line(values: tuple) -> str:
+    # COPY csv: unquoted empty field is NULL, everything else quoted as text
+    fields = []
+    for value in values:
+        if value is None:
+            fields.append("")
+        elif isinstance(value, bool):
+            fields.append("true" if value else "false")
+        else:
+            fields.append('"' + str(value).replace('"', '""') + '"')
+    return ",".join(fields) + "\n"
+
+
+def _insert_batch(db: Session, user_id: str, rows: List[dict]):
+    """Insert one batch in its own transaction (COPY on psycopg2)"""
+    dialect = db.get_bind().dialect
+    if dialect.name == "postgresql" and dialect.driver == "psycopg2":
+        buffer = io.StringIO("".join(_copy_line(tuple(row[c] for c in COPY_COLUMNS)) for row in rows))
+        cursor = db.connection().connection.cursor()
+        cursor.copy_expert(
+            f"COPY tasks ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+    else:
+        # Multi-row INSERT ... VALUES via executemany
+        db.exec(insert(Task), params=rows)
+
+    bump_revision(db, user_id)
+    db.commit()
+    invalidate_user_cache(user_id)
+
+
+def _rollback(db: Session):
+    db.rollback()
+
+
+@router.post("/api/{user_id}/tasks/import", response_model=TaskImportResponse)
+async def import_tasks(
+    user_id: str,
+    request: Request,
+    format: Optional[Literal["ndjson", "csv"]] = None,
+    db: Session = Depends(get_session),
+    current_user_id: str = Depends(get_current_user)
+):
+    """
+    Import tasks from a streamed NDJSON or CSV request body
+    - Validates URL user_id matches JWT user_id
+    - format defaults from Content-Type (text/csv -> csv, otherwise ndjson)
+    - Each row is validated like TaskCreate (plus optional completed);
+      invalid rows are reported by line number and skipped
+    - Valid rows are inserted in batches of TASKS_IMPORT_BATCH_SIZE, each
+      committed on its own, so memory stays bounded for any file size
+    """
+    # Verify user_id in URL matches authenticated user
+    if user_id != current_user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Cannot import tasks for other users"
+        )
+
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if content_type.startswith("text/csv") else "ndjson"
+
+    imported = 0
+    failed = 0
+    errors: List[TaskImportError] = []
+    batch: List[dict] = []
+    batch_lines: List[int] = []
+
+    def reject(line: int, message: str):
+        nonlocal failed
+        failed += 1
+        if len(errors) < settings.TASKS_IMPORT_MAX_ERRORS:
+            errors.append(TaskImportError(line=line, error=message))
+
+    async def flush():
+        nonlocal imported
+        try:
+            await run_db(db, _insert_batch, current_user_id, batch)
+            imported += len(batch)
+        except Exception as e:
+            # Raw DBAPI errors from COPY are not wrapped by SQLAlchemy, so catch
+            # broadly; a failed batch is reported row by row and later batches still run
+            logger.exception("Import batch failed")
+            await run_db(db, _rollback)
+            for line in batch_lines:
+                reject(line, f"Database error: {type(e).__name__}")
+        batch.clear()
+        batch_lines.clear()
+
+    async for line, record in _iter_records(request, format):
+        if isinstance(record, str):
+            reject(line, record)
+            continue
+
+        try:
+            task_data = TaskImport.model_validate(record)
+        except ValidationError as e:
+            reject(line, "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                for error in e.errors()
+            ))
+            continue
+
+        now = datetime.utcnow()
+        batch.append({
+            "id": uuid4(),
+            "user_id": current_user_id,
+            "title": task_data.title,
+            "description": task_data.description,
+            "completed": task_data.completed,
+            "created_at": now,
+            "updated_at": now,
+        })
+        batch_lines.append(line)
+
+        if len(batch) >= settings.TASKS_IMPORT_BATCH_SIZE:
+            await flush()
+
+    if batch:
+        await flush()
+
+    # One event for the whole import; listeners catch up through /tasks/sync
+    if imported:
+        await task_events.publish(current_user_id, RESYNC_EVENT, {})
+
+    return TaskImportResponse(
+        imported=imported,
+        failed=failed,
+        errors=errors,
+        errors_truncated=failed > len(errors)
+    )
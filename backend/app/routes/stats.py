@@ -0,0 +1,95 @@
+# Task statistics from aggregate queries
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlmodel import Session, func, select, union_all
+from app.cache import read_through
+from app.database import get_read_session, run_db
+from app.dependencies import get_current_user
+from app.models.archived_task import ArchivedTask
+from app.models.task import Task
+from app.responses import FastJSONResponse
+from app.revisions import etag_matches, get_revision, make_etag
+from app.schemas.task import TaskStatsResponse
+from typing import Optional
+
+router = APIRouter()
+
+
+def _select_stats(db: Session, user_id: str, days: int) -> dict:
+    # One GROUP BY over the (user_id, completed, ...) index
+    statement = (
+        select(Task.completed, func.count())
+        .where(Task.user_id == user_id)
+        .group_by(Task.completed)
+    )
+    counts = {completed: count for completed, count in db.exec(statement)}
+    # Archived tasks are all completed; counted over the (user_id, archived_at, id) index
+    archived = db.exec(select(func.count()).select_from(ArchivedTask).where(ArchivedTask.user_id == user_id)).one()
+    completed = counts.get(True, 0) + archived
+    total = completed + counts.get(False, 0)
+
+    stats = {
+        "total": total,
+        "completed": completed,
+        "pending": total - completed,
+        "archived": archived,
+        "completion_rate": round(completed / total, 4) if total else 0.0,
+        "created_per_day": None,
+    }
+
+    if days:
+        since = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days - 1)
+        created = union_all(
+            select(Task.created_at).where(Task.user_id == user_id, Task.created_at >= since),
+            select(ArchivedTask.created_at).where(ArchivedTask.user_id == user_id, ArchivedTask.created_at >= since),
+        ).subquery()
+        day = func.date(created.c.created_at)
+        statement = select(day, func.count()).group_by(day).order_by(day)
+        stats["created_per_day"] = [
+            {"date": str(bucket), "count": count} for bucket, count in db.exec(statement)
+        ]
+
+    return stats
+
+
+@router.get("/api/{user_id}/tasks/stats", response_model=TaskStatsResponse)
+async def task_stats(
+    user_id: str,
+    days: int = Query(0, ge=0, le=365),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_session),
+    current_user_id: str = Depends(get_current_user)
+):
+    """
+    Task counts and completion rate for the authenticated user
+    - Validates URL user_id matches JWT user_id
+    - Archived tasks (see app/archive.py) are included: they count as completed,
+      appear in created-per-day buckets and are also reported on their own as archived
+    - days=N adds created-per-day buckets for the last N UTC days (days with no tasks are omitted)
+    - Computed with aggregate queries and cached per user revision, so repeat
+      calls between writes cost one primary-key lookup (or a 304)
+    """
+    # Verify user_id in URL matches authenticated user
+    if user_id != current_user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Cannot access other users' tasks"
+        )
+
+    revision = await run_db(db, get_revision, current_user_id)
+
+    # Day buckets also depend on today's date, so only plain counts get an ETag
+    headers = {}
+    if not days:
+        etag = make_etag(revision)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    today = datetime.utcnow().date() if days else None
+    stats = await read_through(
+        db, current_user_id, ("stats", days, today), revision,
+        _select_stats, current_user_id, days
+    )
+
+    return FastJSONResponse(stats, headers=headers)
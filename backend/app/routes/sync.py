@@ -0,0 +1,234 @@
+# Delta sync: tasks changed and deleted since a client's last sync
+import base64
+import json
+from datetime import datetime, timedelta
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlmodel import Session, and_, or_, select
+from app.config import settings
+from app.database import get_read_session, run_db
+from app.dependencies import get_current_user
+from app.models.task import TASK_COLUMNS, Task
+from app.models.tombstone import TaskTombstone
+from app.responses import FastJSONResponse, task_dict
+from app.revisions import get_revision
+from app.schemas.task import TaskSyncResponse
+from app.tombstones import tombstone_cutoff
+from typing import NamedTuple, Optional, Tuple
+
+router = APIRouter()
+
+
+class SyncPage(NamedTuple):
+    """
+    Position inside a sync that spans several pages
+
+    revision and synced_at are what the final token will hold, fixed when
+    the first page is served; since is the lower bound of the whole sync
+    (None for a snapshot). The *_after pairs are the (timestamp, id) of the
+    last task/tombstone sent, and *_done mark exhausted streams.
+    """
+    revision: int
+    synced_at: datetime
+    since: Optional[datetime]
+    tasks_after: Optional[Tuple[datetime, UUID]] = None
+    deleted_after: Optional[Tuple[datetime, UUID]] = None
+    tasks_done: bool = False
+    deleted_done: bool = False
+
+
+def _encode(payload) -> str:
+    raw = json.dumps(payload, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def encode_sync_token(revision: int, synced_at: datetime) -> str:
+    """Opaque token holding the revision and server time of a sync"""
+    return _encode([revision, synced_at.isoformat()])
+
+
+def encode_page_token(page: SyncPage) -> str:
+    """Opaque token continuing a sync at page"""
+    def position(after):
+        return [after[0].isoformat(), str(after[1])] if after else None
+
+    return _encode({
+        "r": page.revision,
+        "t": page.synced_at.isoformat(),
+        "s": page.since.isoformat() if page.since else None,
+        "ta": position(page.tasks_after),
+        "da": position(page.deleted_after),
+        "td": page.tasks_done,
+        "dd": page.deleted_done,
+    })
+
+
+def decode_sync_token(token: str):
+    """
+    Decode a token produced by encode_sync_token or encode_page_token
+
+    Returns:
+        Tuple[int, datetime] for a finished sync, or a SyncPage to continue
+
+    Raises:
+        HTTPException: 400 if token is malformed
+    """
+    def position(value):
+        return (datetime.fromisoformat(value[0]), UUID(value[1])) if value else None
+
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        if isinstance(payload, dict):
+            return SyncPage(
+                revision=int(payload["r"]),
+                synced_at=datetime.fromisoformat(payload["t"]),
+                since=datetime.fromisoformat(payload["s"]) if payload["s"] else None,
+                tasks_after=position(payload["ta"]),
+                deleted_after=position(payload["da"]),
+                tasks_done=bool(payload["td"]),
+                deleted_done=bool(payload["dd"]),
+            )
+        revision, synced_at = payload
+        return int(revision), datetime.fromisoformat(synced_at)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid sync token"
+        )
+
+
+def _seek(timestamp_column, id_column, after: Tuple[datetime, UUID]):
+    # Keyset condition: strictly past (timestamp, id) of the last row sent
+    after_value, after_id = after
+    return or_(timestamp_column > after_value, and_(timestamp_column == after_value, id_column > after_id))
+
+
+def _select_changes(db: Session, user_id: str, page: SyncPage, limit: int) -> Tuple[dict, SyncPage]:
+    """
+    One page of changes: up to limit tasks and up to limit tombstones
+
+    Both are read in (timestamp, id) order from the (user_id, updated_at)
+    and (user_id, deleted_at) indexes. A task updated while the client is
+    paging gets a newer updated_at, so it is sent on a later page (or the
+    next sync) rather than skipped.
+    """
+    tasks = []
+    if not page.tasks_done:
+        statement = select(*TASK_COLUMNS).where(Task.user_id == user_id)
+        if page.since is not None:
+            statement = statement.where(Task.updated_at > page.since)
+        if page.tasks_after is not None:
+            statement = statement.where(_seek(Task.updated_at, Task.id, page.tasks_after))
+        rows = db.exec(statement.order_by(Task.updated_at, Task.id).limit(limit + 1)).all()
+        page = page._replace(tasks_done=len(rows) <= limit)
+        rows = rows[:limit]
+        if rows:
+            page = page._replace(tasks_after=(rows[-1].updated_at, rows[-1].id))
+        tasks = [task_dict(row) for row in rows]
+
+    deleted = []
+    if page.since is None:
+        # A snapshot has nothing to delete on the client
+        page = page._replace(deleted_done=True)
+    elif not page.deleted_done:
+        statement = select(TaskTombstone.task_id, TaskTombstone.deleted_at).where(
+            TaskTombstone.user_id == user_id,
+            TaskTombstone.deleted_at > page.since
+        )
+        if page.deleted_after is not None:
+            statement = statement.where(_seek(TaskTombstone.deleted_at, TaskTombstone.task_id, page.deleted_after))
+        rows = db.exec(
+            statement.order_by(TaskTombstone.deleted_at, TaskTombstone.task_id).limit(limit + 1)
+        ).all()
+        page = page._replace(deleted_done=len(rows) <= limit)
+        rows = rows[:limit]
+        if rows:
+            page = page._replace(deleted_after=(rows[-1].deleted_at, rows[-1].task_id))
+        deleted = [row.task_id for row in rows]
+
+    return {"tasks": tasks, "deleted": deleted}, page
+
+
+@router.get("/api/{user_id}/tasks/sync", response_model=TaskSyncResponse)
+async def sync_tasks(
+    user_id: str,
+    since: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=settings.TASKS_PAGE_MAX_LIMIT),
+    db: Session = Depends(get_read_session),
+    current_user_id: str = Depends(get_current_user)
+):
+    """
+    Tasks changed since the client's last sync
+    - Validates URL user_id matches JWT user_id
+    - Without since: full snapshot of the user's tasks (full=true)
+    - With since=<sync_token>: tasks created/updated after it plus the ids
+      of tasks deleted after it; unchanged revisions return no rows at all
+    - Returns 410 if the token is older than tombstone retention; the
+      client must discard its copy and sync again without since
+    - Rows near the token boundary may be sent again, so clients should
+      upsert by id
+    - At most limit tasks (default and maximum TASKS_PAGE_MAX_LIMIT) and
+      limit deleted ids per response; while has_more is true, request the
+      next page right away with since=<sync_token>. Only the token of the
+      last page (has_more=false) should be stored for the next sync
+    """
+    # Verify user_id in URL matches authenticated user
+    if user_id != current_user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Cannot access other users' tasks"
+        )
+
+    token = decode_sync_token(since) if since else None
+    page_size = limit or settings.TASKS_PAGE_MAX_LIMIT
+
+    if isinstance(token, SyncPage):
+        # Continuing a paged sync: same high-water mark and lower bound
+        page = token
+    else:
+        token_revision, synced_at = token if token else (None, None)
+
+        # Take the new high-water mark before reading, so changes committed
+        # during this request are picked up by the next sync
+        now = datetime.utcnow()
+        revision = await run_db(db, get_revision, current_user_id)
+
+        if synced_at is not None and synced_at < tombstone_cutoff():
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Sync token expired; sync again without since"
+            )
+
+        if token_revision == revision:
+            # No write since the token: skip the change queries
+            return FastJSONResponse({
+                "tasks": [],
+                "deleted": [],
+                "sync_token": since,
+                "revision": revision,
+                "full": False,
+                "has_more": False,
+            })
+
+        # Overlap covers writes stamped just before synced_at (clock skew
+        # between workers, transactions committing after our read)
+        after = synced_at - timedelta(seconds=settings.TASKS_SYNC_OVERLAP_SECONDS) if synced_at else None
+        page = SyncPage(revision=revision, synced_at=now, since=after)
+
+    if page.since is not None and page.since < tombstone_cutoff():
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Sync token expired; sync again without since"
+        )
+
+    changes, page = await run_db(db, _select_changes, current_user_id, page, page_size)
+    has_more = not (page.tasks_done and page.deleted_done)
+
+    return FastJSONResponse({
+        **changes,
+        "sync_token": encode_page_token(page) if has_more else encode_sync_token(page.revision, page.synced_at),
+        "revision": page.revision,
+        "full": page.since is None,
+        "has_more": has_more,
+    })
@@ -1,22 +1,237 @@
 # P2-T-011 through P2-T-015: Task API routes
 from datetime import datetime
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
-from app.database import get_db
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy import bindparam
+from sqlalchemy.sql import ClauseElement
+from sqlmodel import Session, and_, delete, not_, or_, select, update
+from app.cache import invalidate_user_cache, read_through
+from app.config import settings
+from app.database import get_read_session, get_session, run_db
 from app.dependencies import get_current_user
-from app.models.task import Task
+from app.events import task_events
+from app.models.task import TASK_COLUMNS, Task
+from app.pagination import decode_cursor, encode_cursor
+from app.responses import FastJSONResponse, dumps, task_dict
+from app.revisions import bump_revision, etag_matches, get_revision, make_etag
+from app.search import search_clause
+from app.tombstones import record_tombstones
+from app.write_coalescer import set_based, write_coalescer
 from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse
-from typing import List
+from typing import Dict, List, Literal, NamedTuple, Optional, Tuple
 
 router = APIRouter()
 
+SORT_COLUMNS = {
+    "created_at": Task.created_at,
+    "updated_at": Task.updated_at,
+    "title": Task.title,
+}
+
+
+class TaskListQuery(NamedTuple):
+    """Everything that shapes one page of list_tasks (also its cache key)"""
+    page_size: int
+    cursor: Optional[str]
+    completed: Optional[bool]
+    q: Optional[str]
+    sort: str
+    order: str
+
+
+# Query helpers: written against a sync Session and executed through run_db,
+# so the same code serves both the sync and the async (DB_ASYNC) modes.
+# Reads return plain dicts or pre-rendered JSON for FastJSONResponse.
+
+def _insert_task(db: Session, task: Task) -> dict:
+    # Every column is generated here, so the response is built from the
+    # pending object instead of re-reading it with db.refresh()
+    created = task_dict(task.model_dump())
+    db.add(task)
+    bump_revision(db, created["user_id"])
+    db.commit()
+    # Not task.user_id: the commit expired it, and reading it would SELECT again
+    invalidate_user_cache(created["user_id"])
+    return created
+
+
+def _select_page(
+    db: Session,
+    user_id: str,
+    query: TaskListQuery,
+    after: Optional[tuple]
+) -> Tuple[List[dict], Optional[str]]:
+    statement = select(*TASK_COLUMNS).where(Task.user_id == user_id)
+
+    # Filters; (user_id, completed, ...) and the search index back these
+    if query.completed is not None:
+        statement = statement.where(Task.completed == query.completed)
+    if query.q:
+        clause = search_clause(db.get_bind().dialect.name, query.q)
+        if clause is not None:
+            statement = statement.where(clause)
+
+    sort_column = SORT_COLUMNS[query.sort]
+    descending = query.order == "desc"
+
+    # Seek past the last row of the previous page instead of using OFFSET
+    if after:
+        after_value, after_id = after
+        if descending:
+            seek = or_(sort_column < after_value, and_(sort_column == after_value, Task.id < after_id))
+        else:
+            seek = or_(sort_column > after_value, and_(sort_column == after_value, Task.id > after_id))
+        statement = statement.where(seek)
+
+    # Fetch one extra row to know whether another page exists
+    if descending:
+        statement = statement.order_by(sort_column.desc(), Task.id.desc())
+    else:
+        statement = statement.order_by(sort_column, Task.id)
+    statement = statement.limit(query.page_size + 1)
+    rows = db.exec(statement).all()
+
+    next_cursor = None
+    if len(rows) > query.page_size:
+        rows = rows[:query.page_size]
+        last = rows[-1]._mapping
+        next_cursor = encode_cursor(query.sort, last[query.sort], last["id"])
+
+    return [task_dict(row) for row in rows], next_cursor
+
+
+def _render_page(db: Session, user_id: str, query: TaskListQuery, after: Optional[tuple]) -> Tuple[bytes, Optional[str]]:
+    # Cached pages hold the encoded body, so a hit skips serialization too
+    tasks, next_cursor = _select_page(db, user_id, query, after)
+    return dumps(tasks), next_cursor
+
+
+def _render_task(db: Session, task_id: UUID, user_id: str) -> Optional[bytes]:
+    statement = select(*TASK_COLUMNS).where(Task.id == task_id, Task.user_id == user_id)
+    row = db.exec(statement).first()
+    return dumps(task_dict(row)) if row is not None else None
+
+
+def _apply_update(db: Session, task_id: UUID, user_id: str, values: dict):
+    """
+    UPDATE the user's task and return the new row, or None if no row matched
+
+    The WHERE clause doubles as the ownership and existence check, so this
+    is a single round trip where the dialect supports UPDATE ... RETURNING.
+    Older SQLite (< 3.35) falls back to UPDATE then SELECT.
+    """
+    statement = (
+        update(Task)
+        .where(Task.id == task_id, Task.user_id == user_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+    if db.get_bind().dialect.update_returning:
+        row = db.exec(statement.returning(*TASK_COLUMNS)).first()
+    else:
+        row = None
+        if db.exec(statement).rowcount:
+            row = db.exec(select(*TASK_COLUMNS).where(Task.id == task_id)).first()
+    return row
+
+
+@set_based(_apply_update)
+def _apply_updates(db: Session, writes: List[Tuple[UUID, str, dict]]) -> list:
+    """
+    _apply_update for a group commit's writes: one executemany per set of
+    columns (SQL expressions such as NOT completed are part of the set),
+    then one SELECT of the rows instead of a RETURNING round trip per write
+
+    Each write gets its task as the batch left it, or None if no row matched.
+    The updated rows stay locked until commit, so the SELECT sees them as
+    written.
+    """
+    shapes: Dict[tuple, list] = {}
+    for task_id, user_id, values in writes:
+        shape = tuple(sorted(
+            (column, str(value) if isinstance(value, ClauseElement) else None)
+            for column, value in values.items()
+        ))
+        params = {f"v_{column}": value for column, value in values.items() if not isinstance(value, ClauseElement)}
+        shapes.setdefault(shape, []).append((values, {"v_id": task_id, "v_user_id": user_id, **params}))
+
+    for group in shapes.values():
+        first = group[0][0]
+        values = {
+            column: value if isinstance(value, ClauseElement) else bindparam(f"v_{column}")
+            for column, value in first.items()
+        }
+        statement = (
+            update(Task)
+            .where(Task.id == bindparam("v_id"), Task.user_id == bindparam("v_user_id"))
+            .values(values)
+        )
+        db.connection().execute(statement, [params for _, params in group])
+
+    task_ids = {task_id for task_id, _, _ in writes}
+    rows = {row.id: row for row in db.exec(select(*TASK_COLUMNS).where(Task.id.in_(task_ids)))}
+    results = []
+    for task_id, user_id, _ in writes:
+        row = rows.get(task_id)
+        results.append(row if row is not None and row.user_id == user_id else None)
+    return results
+
+
+def _update_returning(db: Session, task_id: UUID, user_id: str, values: dict):
+    # _apply_update in a transaction of its own
+    row = _apply_update(db, task_id, user_id, values)
+    if row is not None:
+        bump_revision(db, user_id)
+    db.commit()
+    if row is not None:
+        invalidate_user_cache(user_id)
+    return row
+
+
+def _delete_task(db: Session, task_id: UUID, user_id: str) -> bool:
+    statement = (
+        delete(Task)
+        .where(Task.id == task_id, Task.user_id == user_id)
+        .execution_options(synchronize_session=False)
+    )
+
+    if db.get_bind().dialect.delete_returning:
+        deleted = db.exec(statement.returning(Task.id)).first() is not None
+    else:
+        deleted = db.exec(statement).rowcount > 0
+
+    if deleted:
+        record_tombstones(db, user_id, [task_id])
+        bump_revision(db, user_id)
+    db.commit()
+    if deleted:
+        invalidate_user_cache(user_id)
+    return deleted
+
+
+async def _write_update(db: Session, task_id: UUID, user_id: str, values: dict):
+    # With WRITE_COALESCE_ENABLED the UPDATE joins the next group commit
+    # instead of committing on the request's own session
+    if write_coalescer is not None:
+        return await write_coalescer.submit(user_id, _apply_update, task_id, user_id, values)
+    return await run_db(db, _update_returning, task_id, user_id, values)
+
+
+def _validators(etag: str) -> dict:
+    # no-cache: clients may store the body but must revalidate with If-None-Match
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_validators(etag))
+
 
 @router.post("/api/{user_id}/tasks", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
-def create_task(
+async def create_task(
     user_id: str,
     task_data: TaskCreate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_session),
     current_user_id: str = Depends(get_current_user)
 ):
     """
@@ -30,31 +245,39 @@ def create_task(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Cannot create tasks for other users"
         )
-    
+
     # Create new task with authenticated user_id
     task = Task(
         user_id=current_user_id,  # Use JWT user_id, not URL
         title=task_data.title,
         description=task_data.description
     )
-    
-    db.add(task)
-    db.commit()
-    db.refresh(task)
-    
-    return task
+
+    created = await run_db(db, _insert_task, task)
+    await task_events.publish(current_user_id, "task.created", created)
+    return FastJSONResponse(created, status_code=status.HTTP_201_CREATED)
 
 
 @router.get("/api/{user_id}/tasks", response_model=List[TaskResponse])
-def list_tasks(
+async def list_tasks(
     user_id: str,
-    db: Session = Depends(get_db),
+    limit: Optional[int] = Query(None, ge=1, le=settings.TASKS_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    completed: Optional[bool] = None,
+    q: Optional[str] = Query(None, max_length=200),
+    sort: Literal["created_at", "updated_at", "title"] = "created_at",
+    order: Literal["asc", "desc"] = "asc",
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_session),
     current_user_id: str = Depends(get_current_user)
 ):
     """
-    P2-T-012: List all tasks for authenticated user
+    P2-T-012: List tasks for authenticated user, one page at a time
     - Validates URL user_id matches JWT user_id
     - Returns only tasks owned by authenticated user
+    - Optional filters: completed=true|false, q= (words in title/description)
+    - Ordered by (sort, id) in the given order; pass X-Next-Cursor back as ?cursor= for the next page
+    - Returns 304 without reading tasks when If-None-Match matches the user's revision
     """
     # Verify user_id in URL matches authenticated user
     if user_id != current_user_id:
@@ -62,25 +285,49 @@ def list_tasks(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Cannot access other users' tasks"
         )
-    
+
+    # Read the revision before the rows so the ETag never claims newer data
+    revision = await run_db(db, get_revision, current_user_id)
+    etag = make_etag(revision)
+    if etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+    headers = _validators(etag)
+
     # Query tasks filtered by authenticated user_id
-    statement = select(Task).where(Task.user_id == current_user_id)
-    tasks = db.exec(statement).all()
-    
-    return tasks
+    query = TaskListQuery(
+        page_size=limit or settings.TASKS_PAGE_DEFAULT_LIMIT,
+        cursor=cursor,
+        completed=completed,
+        q=q,
+        sort=sort,
+        order=order
+    )
+    after = decode_cursor(cursor, sort) if cursor else None
+    body, next_cursor = await read_through(
+        db, current_user_id, query, revision,
+        _render_page, current_user_id, query, after
+    )
+
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+
+    return FastJSONResponse(body, headers=headers)
 
 
 @router.get("/api/{user_id}/tasks/{task_id}", response_model=TaskResponse)
-def get_task(
+async def get_task(
     user_id: str,
     task_id: UUID,
-    db: Session = Depends(get_db),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_session),
     current_user_id: str = Depends(get_current_user)
 ):
     """
     P2-T-013: Get single task by ID
     - Validates URL user_id matches JWT user_id
     - Returns 404 if task not found or not owned by user
+    - Returns 304 when If-None-Match matches the user's revision and the
+      task exists (the body comes from the task cache when it is warm)
     """
     # Verify user_id in URL matches authenticated user
     if user_id != current_user_id:
@@ -88,26 +335,35 @@ def get_task(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Cannot access other users' tasks"
         )
-    
-    # Query task by ID and user_id
-    statement = select(Task).where(Task.id == task_id, Task.user_id == current_user_id)
-    task = db.exec(statement).first()
-    
-    if not task:
+
+    revision = await run_db(db, get_revision, current_user_id)
+    etag = make_etag(revision)
+
+    # Query task by ID and user_id; the ETag is per user, so a deleted or
+    # foreign id must get its 404 before If-None-Match is considered
+    body = await read_through(
+        db, current_user_id, ("task", task_id), revision,
+        _render_task, task_id, current_user_id
+    )
+
+    if not body:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
-    
-    return task
+
+    if etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+
+    return FastJSONResponse(body, headers=_validators(etag))
 
 
 @router.put("/api/{user_id}/tasks/{task_id}", response_model=TaskResponse)
-def update_task(
+async def update_task(
     user_id: str,
     task_id: UUID,
     task_data: TaskUpdate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_session),
     current_user_id: str = Depends(get_current_user)
 ):
     """
@@ -122,37 +378,27 @@ def update_task(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Cannot update other users' tasks"
         )
-    
-    # Find task by ID and user_id
-    statement = select(Task).where(Task.id == task_id, Task.user_id == current_user_id)
-    task = db.exec(statement).first()
-    
+
+    # Find and update task by ID and user_id: only provided fields, plus timestamp
+    update_data = task_data.model_dump(exclude_unset=True)
+    task = await _write_update(db, task_id, current_user_id, {**update_data, "updated_at": datetime.utcnow()})
+
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
-    
-    # Update only provided fields
-    update_data = task_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(task, field, value)
-    
-    # Update timestamp
-    task.updated_at = datetime.utcnow()
-    
-    db.add(task)
-    db.commit()
-    db.refresh(task)
-    
-    return task
+
+    updated = task_dict(task)
+    await task_events.publish(current_user_id, "task.updated", updated)
+    return FastJSONResponse(updated)
 
 
 @router.delete("/api/{user_id}/tasks/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_task(
+async def delete_task(
     user_id: str,
     task_id: UUID,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_session),
     current_user_id: str = Depends(get_current_user)
 ):
     """
@@ -166,28 +412,25 @@ def delete_task(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Cannot delete other users' tasks"
         )
-    
-    # Find task by ID and user_id
-    statement = select(Task).where(Task.id == task_id, Task.user_id == current_user_id)
-    task = db.exec(statement).first()
-    
-    if not task:
+
+    # Find and delete task by ID and user_id
+    deleted = await run_db(db, _delete_task, task_id, current_user_id)
+
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
-    
-    db.delete(task)
-    db.commit()
-    
+
+    await task_events.publish(current_user_id, "task.deleted", {"id": task_id})
     return None
 
 
 @router.patch("/api/{user_id}/tasks/{task_id}/complete", response_model=TaskResponse)
-def toggle_complete(
+async def toggle_complete(
     user_id: str,
     task_id: UUID,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_session),
     current_user_id: str = Depends(get_current_user)
 ):
     """
@@ -201,23 +444,19 @@ def toggle_complete(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Cannot update other users' tasks"
         )
-    
-    # Find task by ID and user_id
-    statement = select(Task).where(Task.id == task_id, Task.user_id == current_user_id)
-    task = db.exec(statement).first()
-    
+
+    # Find and toggle task by ID and user_id, in SQL so no prior read is needed
+    task = await _write_update(db, task_id, current_user_id, {
+        "completed": not_(Task.completed),
+        "updated_at": datetime.utcnow(),
+    })
+
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
-    
-    # Toggle completion status
-    task.completed = not task.completed
-    task.updated_at = datetime.utcnow()
-    
-    db.add(task)
-    db.commit()
-    db.refresh(task)
-    
-    return task
+
+    toggled = task_dict(task)
+    await task_events.publish(current_user_id, "task.updated", toggled)
+    return FastJSONResponse(toggled)
@@ -0,0 +1,128 @@
+# Schema setup: fingerprint check at boot, or an explicit migration step
+#
+#   python -m app.schema        apply the schema now (e.g. Heroku release phase)
+import hashlib
+import logging
+from datetime import datetime
+from sqlalchemy import inspect
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.schema import CreateIndex, CreateTable
+from sqlmodel import SQLModel, delete, insert, select
+from app.database import create_db_and_tables, get_engine
+from app.models.schema_version import SchemaVersion
+from app.search import POSTGRES_SEARCH_DDL, SQLITE_SEARCH_DDL
+from typing import List
+
+# Every table must be registered on the metadata before it is fingerprinted
+import app.models.archived_task  # noqa: F401
+import app.models.idempotency  # noqa: F401
+import app.models.revision  # noqa: F401
+import app.models.task  # noqa: F401
+import app.models.tombstone  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+
+class SchemaDriftError(RuntimeError):
+    """An existing table's columns differ from its model; needs a migration"""
+
+
+def schema_fingerprint(dialect) -> str:
+    """
+    Hash of the DDL create_db_and_tables would run for dialect
+
+    Any change to a model's columns or indexes, or to the search DDL,
+    changes the fingerprint and triggers a schema apply. Applying only
+    creates missing tables and indexes: create_all never alters an existing
+    table, so a column change is refused by apply_schema instead.
+    """
+    digest = hashlib.sha256()
+    for table in SQLModel.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    search_ddl = {"postgresql": POSTGRES_SEARCH_DDL, "sqlite": SQLITE_SEARCH_DDL}
+    for statement in search_ddl.get(dialect.name, []):
+        digest.update(statement.encode())
+    return digest.hexdigest()
+
+
+def find_column_drift(connection) -> List[str]:
+    """
+    Describe existing tables whose column names differ from their models
+
+    Only names are compared; a changed type or nullability is not detected.
+    Tables that do not exist yet are skipped (create_all makes them).
+    """
+    inspector = inspect(connection)
+    existing = set(inspector.get_table_names())
+    problems = []
+    for table in SQLModel.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        expected = {column.name for column in table.columns}
+        actual = {column["name"] for column in inspector.get_columns(table.name)}
+        if expected - actual:
+            problems.append(f"{table.name} is missing {', '.join(sorted(expected - actual))}")
+        if actual - expected:
+            problems.append(f"{table.name} has unmodelled {', '.join(sorted(actual - expected))}")
+    return problems
+
+
+def apply_schema() -> str:
+    """
+    Create missing tables and indexes, then record the fingerprint
+
+    Raises:
+        SchemaDriftError: if an existing table's columns changed; create_all
+            cannot alter tables, so that needs an explicit migration first
+    """
+    engine = get_engine()
+    fingerprint = schema_fingerprint(engine.dialect)
+    with engine.connect() as connection:
+        problems = find_column_drift(connection)
+    if problems:
+        raise SchemaDriftError(
+            "Database columns do not match the models (migrate them, then rerun "
+            "python -m app.schema): " + "; ".join(problems)
+        )
+    create_db_and_tables()
+    with engine.begin() as connection:
+        connection.execute(delete(SchemaVersion))
+        connection.execute(insert(SchemaVersion).values(
+            id=1, fingerprint=fingerprint, applied_at=datetime.utcnow()
+        ))
+    return fingerprint
+
+
+def ensure_schema() -> bool:
+    """
+    Apply the schema only if the database does not already have it
+
+    One primary-key read when the schema is current, instead of the
+    catalog queries create_all issues per table and index.
+
+    Returns:
+        bool: True if the schema was applied, False if it was current
+    """
+    engine = get_engine()
+    fingerprint = schema_fingerprint(engine.dialect)
+    try:
+        with engine.connect() as connection:
+            current = connection.execute(
+                select(SchemaVersion.fingerprint).where(SchemaVersion.id == 1)
+            ).scalar()
+        if current == fingerprint:
+            return False
+    except SQLAlchemyError:
+        # No schema_version table yet: first boot of this version
+        pass
+
+    logger.info("Database schema out of date; applying")
+    apply_schema()
+    return True
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    logger.info("Schema applied (fingerprint %s)", apply_schema()[:12])
@@ -2,7 +2,8 @@
 from pydantic import BaseModel, Field
 from uuid import UUID
 from datetime import datetime
-from typing import Optional
+from typing import Annotated, List, Literal, Optional, Union
+from app.config import settings
 
 
 class TaskBase(BaseModel):
@@ -16,6 +17,11 @@ class TaskCreate(TaskBase):
     pass
 
 
+class TaskImport(TaskCreate):
+    """Schema for one imported task row (completion state is carried over)"""
+    completed: bool = False
+
+
 class TaskUpdate(BaseModel):
     """Schema for updating a task (all fields optional)"""
     title: Optional[str] = Field(None, min_length=1, max_length=200)
@@ -33,3 +39,102 @@ class TaskResponse(TaskBase):
     
     class Config:
         from_attributes = True
+
+
+class ArchivedTaskResponse(TaskResponse):
+    """Schema for archived task responses"""
+    archived_at: datetime
+
+
+class BatchCreateOperation(BaseModel):
+    """Batch operation: create a task"""
+    op: Literal["create"]
+    data: TaskCreate
+
+
+class BatchUpdateOperation(BaseModel):
+    """Batch operation: partially update a task"""
+    op: Literal["update"]
+    id: UUID
+    data: TaskUpdate
+
+
+class BatchDeleteOperation(BaseModel):
+    """Batch operation: delete a task"""
+    op: Literal["delete"]
+    id: UUID
+
+
+class BatchToggleOperation(BaseModel):
+    """Batch operation: toggle a task's completion status"""
+    op: Literal["toggle"]
+    id: UUID
+
+
+TaskBatchOperation = Annotated[
+    Union[BatchCreateOperation, BatchUpdateOperation, BatchDeleteOperation, BatchToggleOperation],
+    Field(discriminator="op")
+]
+
+
+class TaskBatchRequest(BaseModel):
+    """Schema for a batch of task operations applied in one transaction"""
+    # max_length is checked before any operation is validated, so an
+    # oversized batch is rejected without parsing its operations
+    operations: List[TaskBatchOperation] = Field(
+        ..., min_length=1, max_length=settings.TASKS_BATCH_MAX_OPERATIONS
+    )
+
+
+class TaskBatchResult(BaseModel):
+    """Outcome of one batch operation, in request order"""
+    index: int
+    op: str
+    status: int
+    task: Optional[TaskResponse] = None
+    error: Optional[str] = None
+
+
+class TaskBatchResponse(BaseModel):
+    """Schema for batch responses"""
+    results: List[TaskBatchResult]
+
+
+class TaskImportError(BaseModel):
+    """A rejected import row"""
+    line: int
+    error: str
+
+
+class TaskImportResponse(BaseModel):
+    """Schema for import responses"""
+    imported: int
+    failed: int
+    errors: List[TaskImportError]
+    errors_truncated: bool
+
+
+class TaskDayCount(BaseModel):
+    """Tasks created on one UTC day"""
+    date: str
+    count: int
+
+
+class TaskStatsResponse(BaseModel):
+    """Schema for task statistics responses"""
+    total: int
+    completed: int
+    pending: int
+    archived: int  # Included in total and completed
+    completion_rate: float
+    created_per_day: Optional[List[TaskDayCount]] = None
+
+
+class TaskSyncResponse(BaseModel):
+    """Schema for delta sync responses"""
+    tasks: List[TaskResponse]  # Created or updated since the token
+    deleted: List[UUID]  # Ids of tasks deleted (or archived) since the token
+    sync_token: str  # Pass back as ?since= for the next page, or the next sync
+    revision: int
+    full: bool  # True when tasks is (a page of) a full snapshot (no since token)
+    has_more: bool  # More pages follow; request them with sync_token right away
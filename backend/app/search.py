@@ -0,0 +1,78 @@
+# Full-text search over task title and description
+import re
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlmodel import and_, or_
+from app.models.task import Task
+
+
+# Postgres: GIN index over the same expression the search predicate uses,
+# so the planner can match it
+POSTGRES_SEARCH_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_tasks_search ON tasks "
+    "USING gin (to_tsvector('simple', title || ' ' || coalesce(description, '')))",
+]
+
+# SQLite: external-content FTS5 table kept in sync with tasks by triggers
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    "title, description, content='tasks', content_rowid='rowid')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, title, description) "
+    "VALUES (new.rowid, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.rowid, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.rowid, old.title, old.description); "
+    "INSERT INTO tasks_fts(rowid, title, description) "
+    "VALUES (new.rowid, new.title, new.description); END",
+]
+
+
+def install_search(connection: Connection):
+    """
+    Create the search index for the connected dialect (idempotent)
+
+    A newly created SQLite FTS table is rebuilt from existing tasks.
+    """
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        for statement in POSTGRES_SEARCH_DDL:
+            connection.execute(text(statement))
+    elif dialect == "sqlite":
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'")
+        ).first()
+        for statement in SQLITE_SEARCH_DDL:
+            connection.execute(text(statement))
+        if not exists:
+            connection.execute(text("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')"))
+
+
+def search_clause(dialect: str, q: str):
+    """
+    WHERE clause matching tasks whose title or description contain every
+    word of q as a prefix, or None if q has no searchable words
+    """
+    terms = re.findall(r"\w+", q)
+    if not terms:
+        return None
+
+    if dialect == "postgresql":
+        return text(
+            "to_tsvector('simple', title || ' ' || coalesce(description, '')) "
+            "@@ to_tsquery('simple', :ts_query)"
+        ).bindparams(ts_query=" & ".join(f"{term}:*" for term in terms))
+
+    if dialect == "sqlite":
+        return text(
+            "tasks.rowid IN (SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH :fts_query)"
+        ).bindparams(fts_query=" ".join(f'"{term}"*' for term in terms))
+
+    # Other dialects: unindexed substring match
+    return and_(*(
+        or_(Task.title.ilike(f"%{term}%"), Task.description.ilike(f"%{term}%"))
+        for term in terms
+    ))
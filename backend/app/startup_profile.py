@@ -0,0 +1,45 @@
+# Import and startup timings, logged at boot and served at /health/startup
+import logging
+from contextlib import contextmanager
+from time import perf_counter
+from app import IMPORT_STARTED
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfile:
+    """Milliseconds spent importing the app and in each startup phase"""
+
+    def __init__(self):
+        self.import_ms: Optional[float] = None
+        self.phases: Dict[str, float] = {}
+        self.notes: Dict[str, str] = {}
+
+    def imported(self):
+        """Call at the end of app.main to close the import phase"""
+        self.import_ms = round((perf_counter() - IMPORT_STARTED) * 1000, 1)
+
+    @contextmanager
+    def phase(self, name: str):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round((perf_counter() - start) * 1000, 1)
+
+    def report(self) -> dict:
+        return {
+            "import_ms": self.import_ms,
+            "startup_ms": self.phases,
+            "total_ms": round((self.import_ms or 0) + sum(self.phases.values()), 1),
+            **self.notes,
+        }
+
+    def log(self):
+        report = self.report()
+        phases = ", ".join(f"{name} {ms} ms" for name, ms in self.phases.items())
+        logger.info("Startup profile: import %s ms, %s (total %s ms)", self.import_ms, phases, report["total_ms"])
+
+
+startup_profile = StartupProfile()
@@ -0,0 +1,32 @@
+# Tombstones for hard-deleted tasks, read by the sync endpoint
+from datetime import datetime, timedelta
+from uuid import UUID
+from sqlmodel import Session, delete, insert
+from app.config import settings
+from app.models.tombstone import TaskTombstone
+from typing import Iterable
+
+
+def tombstone_cutoff() -> datetime:
+    """Oldest deleted_at still retained; sync tokens before it have expired"""
+    return datetime.utcnow() - timedelta(days=settings.TASKS_SYNC_TOMBSTONE_RETENTION_DAYS)
+
+
+def record_tombstones(db: Session, user_id: str, task_ids: Iterable[UUID]):
+    """
+    Record deleted task ids inside the caller's transaction
+
+    Also prunes the user's tombstones past retention, which keeps the
+    table bounded without a separate cleanup job.
+    """
+    now = datetime.utcnow()
+    rows = [{"task_id": task_id, "user_id": user_id, "deleted_at": now} for task_id in task_ids]
+    if not rows:
+        return
+
+    db.exec(insert(TaskTombstone), params=rows)
+    db.exec(
+        delete(TaskTombstone)
+        .where(TaskTombstone.user_id == user_id, TaskTombstone.deleted_at < tombstone_cutoff())
+        .execution_options(synchronize_session=False)
+    )
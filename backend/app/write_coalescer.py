@@ -0,0 +1,168 @@
+# Group commit: concurrent small task writes share one transaction
+import asyncio
+import logging
+from sqlmodel import Session
+from app.cache import invalidate_user_cache
+from app.config import settings
+from app.database import run_db, session_scope
+from app.metrics import request_timings
+from app.query_stats import request_queries
+from app.revisions import bump_revision
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# fn -> fn_many(db, [args, ...]) returning one result per args, which
+# applies many fn writes with a few set-based statements
+_set_based: Dict[Callable, Callable] = {}
+
+
+def set_based(fn: Callable) -> Callable:
+    """Register the decorated function as the set-based form of fn"""
+    def register(fn_many: Callable) -> Callable:
+        _set_based[fn] = fn_many
+        return fn_many
+    return register
+
+
+class PendingWrite(NamedTuple):
+    user_id: str
+    fn: Callable[..., Any]
+    args: tuple
+    future: asyncio.Future
+
+
+def apply_writes(db: Session, writes: List[Tuple[str, Callable, tuple]]) -> list:
+    """
+    Run each fn(db, *args) and commit them all at once
+
+    A write's fn must not commit; it returns None when it changed nothing
+    (e.g. the task was not found). Writes sharing a fn registered with
+    set_based run through its set-based form in one call, in submission
+    order among themselves. Each user with at least one change gets a
+    single revision bump, in user order so concurrent batches lock
+    user_revisions rows in the same order.
+    """
+    groups: Dict[Callable, List[int]] = {}
+    for index, (_, fn, _) in enumerate(writes):
+        groups.setdefault(fn, []).append(index)
+
+    results: list = [None] * len(writes)
+    for fn, indexes in groups.items():
+        fn_many = _set_based.get(fn)
+        if fn_many is not None and len(indexes) > 1:
+            for index, result in zip(indexes, fn_many(db, [writes[index][2] for index in indexes])):
+                results[index] = result
+        else:
+            for index in indexes:
+                results[index] = fn(db, *writes[index][2])
+    changed = sorted({user_id for (user_id, _, _), result in zip(writes, results) if result is not None})
+    for user_id in changed:
+        bump_revision(db, user_id)
+    db.commit()
+    for user_id in changed:
+        invalidate_user_cache(user_id)
+    return results
+
+
+class WriteCoalescer:
+    """
+    Collect concurrent writes for a few milliseconds and commit them together
+
+    The first write to arrive while idle waits window seconds for company;
+    writes arriving while a batch is committing form the next batch, which
+    is flushed as soon as the previous commit finishes. One batch commits
+    at a time, so batches never contend with each other for row locks.
+
+    Every caller gets its own result. If the batch transaction fails, its
+    writes are retried one transaction each, so one bad write only fails
+    its own request.
+    """
+
+    def __init__(self, window: float, max_batch: int):
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: List[PendingWrite] = []
+        self._flusher: Optional[asyncio.Task] = None
+        self.writes = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self.fallbacks = 0
+
+    async def submit(self, user_id: str, fn: Callable[..., Any], *args) -> Any:
+        """Run fn(db, *args) in the next group commit and return its result"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(PendingWrite(user_id, fn, args, future))
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+        return await future
+
+    async def _flush_loop(self):
+        # The task inherited the first caller's context; its queries and
+        # timings belong to no single request
+        request_queries.set(None)
+        request_timings.set(None)
+
+        await asyncio.sleep(self.window)
+        while self._pending:
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            await self._commit(batch)
+
+    async def _commit(self, batch: List[PendingWrite]):
+        self.writes += len(batch)
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(batch))
+        try:
+            results = await self._run([(write.user_id, write.fn, write.args) for write in batch])
+        except Exception as exc:
+            if len(batch) == 1:
+                self._settle(batch[0].future, exception=exc)
+                return
+            logger.warning("Group commit of %d writes failed; retrying them one by one", len(batch), exc_info=True)
+            self.fallbacks += 1
+            for write in batch:
+                try:
+                    (result,) = await self._run([(write.user_id, write.fn, write.args)])
+                except Exception as exc:
+                    self._settle(write.future, exception=exc)
+                else:
+                    self._settle(write.future, result=result)
+            return
+
+        for write, result in zip(batch, results):
+            self._settle(write.future, result=result)
+
+    @staticmethod
+    async def _run(writes: list) -> list:
+        async with session_scope() as db:
+            return await run_db(db, apply_writes, writes)
+
+    @staticmethod
+    def _settle(future: asyncio.Future, result: Any = None, exception: Optional[BaseException] = None):
+        # The caller may have gone away (client disconnect cancels its await)
+        if future.done():
+            return
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": True,
+            "window_ms": self.window * 1000,
+            "max_batch": self.max_batch,
+            "pending": len(self._pending),
+            "writes": self.writes,
+            "batches": self.batches,
+            "writes_per_batch": round(self.writes / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "fallbacks": self.fallbacks,
+        }
+
+
+# None unless WRITE_COALESCE_ENABLED; routes then commit each write themselves
+write_coalescer = (
+    WriteCoalescer(settings.WRITE_COALESCE_WINDOW_MS / 1000, settings.WRITE_COALESCE_MAX_BATCH)
+    if settings.WRITE_COALESCE_ENABLED else None
+)
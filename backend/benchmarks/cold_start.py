@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Cold Start Profile
+Time to import app.main and run its startup handlers in a fresh
+interpreter, with the slowest imports broken out (python -X importtime).
+
+Usage: python benchmarks/cold_start.py [--runs 5] [--top 15]
+Uses DATABASE_URL and the other settings from the environment (a temporary
+SQLite file if unset), so DB_SCHEMA_MODE and DB_ASYNC can be compared.
+Prints one JSON object to stdout so results can be diffed between commits.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+backend_path = Path(__file__).resolve().parent.parent
+
+# Runs in the child interpreter: import, then the startup handlers
+CHILD = """
+import asyncio, json
+from app.main import app
+from app.startup_profile import startup_profile
+asyncio.run(app.router.startup())
+print(json.dumps(startup_profile.report()))
+"""
+
+
+def child_env() -> dict:
+    env = dict(os.environ)
+    env.setdefault(
+        "DATABASE_URL", f"sqlite:///{Path(tempfile.mkdtemp(prefix='todo-cold-')) / 'cold.db'}"
+    )
+    env.setdefault("JWT_SECRET", "benchmark-secret")
+    env.setdefault("BETTER_AUTH_SECRET", "benchmark-secret")
+    env.setdefault("CORS_ORIGINS", "http://localhost:3000")
+    env["PYTHONPATH"] = str(backend_path)
+    return env
+
+
+def run_child(env: dict, importtime: bool = False) -> subprocess.CompletedProcess:
+    command = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", CHILD]
+    return subprocess.run(command, cwd=backend_path, env=env, capture_output=True, text=True, check=True)
+
+
+def parse_importtime(stderr: str, top: int) -> list:
+    """Slowest modules by cumulative import time"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({
+            "module": name.strip(),
+            "cumulative_ms": round(int(cumulative_us) / 1000, 1),
+            "self_ms": round(int(self_us) / 1000, 1),
+        })
+    modules.sort(key=lambda module: module["cumulative_ms"], reverse=True)
+    return modules[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    env = child_env()
+
+    # First run applies the schema; later runs measure a warm database
+    run_child(env)
+    reports = [json.loads(run_child(env).stdout.splitlines()[-1]) for _ in range(args.runs)]
+    imports = parse_importtime(run_child(env, importtime=True).stderr, args.top)
+
+    def median(values: list) -> float:
+        return round(statistics.median(values), 1)
+
+    phases = sorted({name for report in reports for name in report["startup_ms"]})
+    print(json.dumps({
+        "runs": args.runs,
+        "database": env["DATABASE_URL"].split(":", 1)[0],
+        "schema_mode": env.get("DB_SCHEMA_MODE", "check"),
+        "median_ms": {
+            "import": median([report["import_ms"] for report in reports]),
+            **{name: median([report["startup_ms"].get(name, 0) for report in reports]) for name in phases},
+            "total": median([report["total_ms"] for report in reports]),
+        },
+        "slowest_imports": imports,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
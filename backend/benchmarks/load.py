@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Task API Load Benchmark
+Drives a mixed workload over every route in app/routes/tasks.py against the
+app in-process (ASGI calls, no network) and reports latency percentiles and
+requests per second per route at each concurrency level.
+
+Usage:
+    python benchmarks/load.py [--database-url sqlite:///bench.db]
+                              [--users 10] [--tasks-per-user 200]
+                              [--concurrency 1,8,32] [--requests 2000]
+                              [--seed 1] [--output results.json]
+
+Runs against a fresh SQLite file by default; pass a local Postgres URL
+(e.g. postgresql://postgres@localhost/bench) to measure that instead.
+Settings such as DB_ASYNC or TASK_CACHE_BACKEND are read from the
+environment as usual. Rows of the bench-user-* accounts are deleted and
+re-seeded on every run. Prints one JSON document so runs can be diffed.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from uuid import uuid4
+
+# Add backend to path
+backend_path = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_path))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", default=None,
+                        help="Database to benchmark (default: temporary SQLite file)")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--tasks-per-user", type=int, default=200)
+    parser.add_argument("--concurrency", default="1,8,32",
+                        help="Comma-separated concurrent client counts, one run each")
+    parser.add_argument("--requests", type=int, default=2000,
+                        help="Requests per concurrency level")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=None, help="Also write the JSON report here")
+    return parser.parse_args()
+
+
+args = parse_args()
+
+# Settings are read at import time, so the environment is prepared first
+if args.database_url:
+    os.environ["DATABASE_URL"] = args.database_url
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{Path(tempfile.mkdtemp(prefix='todo-bench-')) / 'bench.db'}"
+)
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+os.environ.setdefault("BETTER_AUTH_SECRET", "benchmark-secret")
+os.environ.setdefault("CORS_ORIGINS", "http://localhost:3000")
+# Measure the app, not admission control (set these to benchmark it too)
+os.environ.setdefault("RATE_LIMIT_BACKEND", "none")
+os.environ.setdefault("MAX_IN_FLIGHT_REQUESTS", "0")
+
+import jwt  # noqa: E402
+from sqlmodel import Session, delete, insert  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.database import create_db_and_tables, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.revision import UserRevision  # noqa: E402
+from app.models.task import Task  # noqa: E402
+from app.models.tombstone import TaskTombstone  # noqa: E402
+
+# Relative frequency of each route in the mixed workload
+WORKLOAD = {
+    "list_tasks": 40,
+    "get_task": 25,
+    "create_task": 10,
+    "update_task": 10,
+    "toggle_complete": 10,
+    "delete_task": 5,
+}
+
+
+def mint_token(user_id: str) -> str:
+    """JWT accepted by get_current_user, signed with settings.JWT_SECRET"""
+    payload = {"sub": user_id, "exp": int(time.time()) + 3600}
+    return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+
+
+def seed(users: list, tasks_per_user: int) -> dict:
+    """Replace the bench users' data; returns task ids by user"""
+    now = datetime.utcnow()
+    task_ids = {}
+    with Session(engine) as db:
+        for model in (Task, TaskTombstone, UserRevision):
+            db.exec(delete(model).where(model.user_id.in_(users)))
+
+        for user_id in users:
+            rows = [
+                {
+                    "id": uuid4(),
+                    "user_id": user_id,
+                    "title": f"Task {i}",
+                    "description": "Benchmark task description" if i % 2 else None,
+                    "completed": i % 3 == 0,
+                    "created_at": now + timedelta(microseconds=i),
+                    "updated_at": now + timedelta(microseconds=i),
+                }
+                for i in range(tasks_per_user)
+            ]
+            if rows:
+                db.exec(insert(Task), params=rows)
+            task_ids[user_id] = [str(row["id"]) for row in rows]
+        db.commit()
+    return task_ids
+
+
+async def call(method: str, path: str, token: str, body: dict = None, query: str = ""):
+    """Send one request straight through the ASGI app; returns (status, body)"""
+    payload = json.dumps(body).encode() if body is not None else b""
+    headers = [(b"authorization", f"Bearer {token}".encode()), (b"host", b"bench")]
+    if body is not None:
+        headers.append((b"content-type", b"application/json"))
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": query.encode(), "root_path": "", "headers": headers,
+        "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+    sent = False
+    response = {"status": 0, "body": []}
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        await asyncio.Event().wait()  # Never disconnects
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            response["body"].append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return response["status"], b"".join(response["body"])
+
+
+async def run_request(rng: random.Random, user_id: str, token: str, task_ids: list):
+    """Issue one request of a randomly chosen route; returns (route, status)"""
+    route = rng.choices(list(WORKLOAD), weights=list(WORKLOAD.values()))[0]
+    if not task_ids and route not in ("list_tasks", "create_task"):
+        route = "create_task"
+    base = f"/api/{user_id}/tasks"
+
+    if route == "list_tasks":
+        status, _ = await call("GET", base, token, query=f"limit={settings.TASKS_PAGE_DEFAULT_LIMIT}")
+    elif route == "create_task":
+        status, body = await call("POST", base, token, {"title": f"Bench {rng.random():.6f}"})
+        if status == 201:
+            task_ids.append(json.loads(body)["id"])
+    elif route == "get_task":
+        status, _ = await call("GET", f"{base}/{rng.choice(task_ids)}", token)
+    elif route == "update_task":
+        status, _ = await call("PUT", f"{base}/{rng.choice(task_ids)}", token, {"title": f"Updated {rng.random():.6f}"})
+    elif route == "toggle_complete":
+        status, _ = await call("PATCH", f"{base}/{rng.choice(task_ids)}/complete", token)
+    else:
+        task_id = task_ids.pop(rng.randrange(len(task_ids)))
+        status, _ = await call("DELETE", f"{base}/{task_id}", token)
+    return route, status
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    # Nearest-rank percentile of an already sorted list
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_level(concurrency: int, total: int, tokens: dict, task_ids: dict, seed_value: int) -> dict:
+    """Run total requests across concurrency clients and summarize per route"""
+    samples = {route: [] for route in WORKLOAD}
+    errors = {route: 0 for route in WORKLOAD}
+    remaining = total
+    users = sorted(tokens)
+
+    async def client(index: int):
+        nonlocal remaining
+        rng = random.Random(seed_value * 1000 + index)
+        while remaining > 0:
+            remaining -= 1
+            user_id = rng.choice(users)
+            start = time.perf_counter()
+            route, status = await run_request(rng, user_id, tokens[user_id], task_ids[user_id])
+            samples[route].append(time.perf_counter() - start)
+            if status >= 400:
+                errors[route] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    routes = {}
+    for route, latencies in samples.items():
+        if not latencies:
+            continue
+        latencies.sort()
+        routes[route] = {
+            "requests": len(latencies),
+            "errors": errors[route],
+            "rps": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        }
+
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "seconds": round(elapsed, 3),
+        "rps": round(total / elapsed, 1),
+        "errors": sum(errors.values()),
+        "routes": routes,
+    }
+
+
+def main():
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+    users = [f"bench-user-{i}" for i in range(args.users)]
+
+    create_db_and_tables()
+    task_ids = seed(users, args.tasks_per_user)
+    tokens = {user_id: mint_token(user_id) for user_id in users}
+
+    async def run_levels():
+        # One event loop for every level: async engine connections are bound to it
+        return [
+            await run_level(concurrency, args.requests, tokens, task_ids, args.seed + level_number)
+            for level_number, concurrency in enumerate(levels)
+        ]
+
+    results = asyncio.run(run_levels())
+
+    report = {
+        "database": engine.url.get_backend_name(),
+        "db_async": settings.DB_ASYNC,
+        "task_cache": settings.TASK_CACHE_BACKEND,
+        "users": args.users,
+        "tasks_per_user": args.tasks_per_user,
+        "seed": args.seed,
+        "workload": WORKLOAD,
+        "levels": results,
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Serialization Benchmark
+Per-row cost of returning a task list: the ORM + response_model path
+versus the Core row + FastJSONResponse path used by the task routes.
+
+Usage: python benchmarks/serialization.py [--rows 5000] [--repeat 20]
+Prints one JSON object to stdout so results can be diffed between commits.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from uuid import uuid4
+
+# Add backend to path
+backend_path = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_path))
+
+# Settings are required at import time; an in-memory database is enough here
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+os.environ.setdefault("BETTER_AUTH_SECRET", "benchmark-secret")
+os.environ.setdefault("CORS_ORIGINS", "http://localhost:3000")
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+from sqlmodel import Session, SQLModel, create_engine, insert, select  # noqa: E402
+from typing import List  # noqa: E402
+
+from app.models.task import TASK_COLUMNS, Task  # noqa: E402
+from app.responses import FastJSONResponse, orjson, task_dict  # noqa: E402
+from app.schemas.task import TaskResponse  # noqa: E402
+
+RESPONSE_FIELD = create_model_field(
+    name="Response_list_tasks", type_=List[TaskResponse], mode="serialization"
+)
+
+
+def seed(engine, rows: int):
+    now = datetime.utcnow()
+    with Session(engine) as db:
+        db.exec(insert(Task), params=[
+            {
+                "id": uuid4(),
+                "user_id": "bench-user",
+                "title": f"Task {i}",
+                "description": "Benchmark task description" if i % 2 else None,
+                "completed": bool(i % 3 == 0),
+                "created_at": now + timedelta(microseconds=i),
+                "updated_at": now + timedelta(microseconds=i),
+            }
+            for i in range(rows)
+        ])
+        db.commit()
+
+
+def before(engine) -> bytes:
+    """ORM objects -> response_model validation/serialization -> JSONResponse"""
+    with Session(engine) as db:
+        tasks = db.exec(select(Task).where(Task.user_id == "bench-user")).all()
+        return serialize_before(tasks)
+
+
+def after(engine) -> bytes:
+    """Core rows -> dicts -> FastJSONResponse"""
+    with Session(engine) as db:
+        rows = db.exec(select(*TASK_COLUMNS).where(Task.user_id == "bench-user")).all()
+        return serialize_after(rows)
+
+
+def serialize_before(tasks: list) -> bytes:
+    content = asyncio.run(serialize_response(field=RESPONSE_FIELD, response_content=tasks))
+    return JSONResponse(content).body
+
+
+def serialize_after(rows: list) -> bytes:
+    return FastJSONResponse([task_dict(row) for row in rows]).body
+
+
+def measure(fn, arg, repeat: int) -> float:
+    fn(arg)  # Warm up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    seed(engine, args.rows)
+
+    # Both paths must produce the same document
+    assert json.loads(before(engine)) == json.loads(after(engine))
+
+    # End to end: query + hydrate + serialize
+    before_s = measure(before, engine, args.repeat)
+    after_s = measure(after, engine, args.repeat)
+
+    # Serialization only, on rows that were already fetched
+    with Session(engine) as db:
+        tasks = db.exec(select(Task)).all()
+        rows = db.exec(select(*TASK_COLUMNS)).all()
+        serialize_before_s = measure(serialize_before, tasks, args.repeat)
+        serialize_after_s = measure(serialize_after, rows, args.repeat)
+
+    def per_row(seconds: float) -> float:
+        return round(seconds / args.rows * 1e6, 3)
+
+    print(json.dumps({
+        "rows": args.rows,
+        "json_backend": "orjson" if orjson is not None else "stdlib",
+        "end_to_end": {
+            "before_us_per_row": per_row(before_s),
+            "after_us_per_row": per_row(after_s),
+            "speedup": round(before_s / after_s, 2),
+        },
+        "serialize_only": {
+            "before_us_per_row": per_row(serialize_before_s),
+            "after_us_per_row": per_row(serialize_after_s),
+            "speedup": round(serialize_before_s / serialize_after_s, 2),
+        },
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
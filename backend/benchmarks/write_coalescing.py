@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Write Coalescing Benchmark
+Time to apply one group commit of task updates: write by write (one
+UPDATE ... RETURNING per write) versus the set-based path the coalescer
+uses (one executemany per set of columns plus one SELECT).
+
+Usage: python benchmarks/write_coalescing.py [--database-url sqlite:///bench.db]
+                                             [--batch-sizes 10,50,100] [--repeat 20]
+
+Runs against a fresh SQLite file by default; pass a local Postgres URL to
+measure the round trips that batching saves there. Rows of the
+bench-coalesce-* accounts are deleted and re-seeded on every run.
+Prints one JSON object to stdout so results can be diffed between commits.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from uuid import uuid4
+
+# Add backend to path
+backend_path = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_path))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--batch-sizes", default="10,50,100")
+    parser.add_argument("--repeat", type=int, default=20)
+    return parser.parse_args()
+
+
+args = parse_args()
+
+# Settings are required at import time
+os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench.db'}"
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+os.environ.setdefault("BETTER_AUTH_SECRET", "benchmark-secret")
+os.environ.setdefault("CORS_ORIGINS", "http://localhost:3000")
+os.environ.setdefault("TASK_CACHE_BACKEND", "none")
+
+from sqlmodel import Session, delete, insert, not_  # noqa: E402
+
+from app import write_coalescer  # noqa: E402
+from app.database import create_db_and_tables, get_engine  # noqa: E402
+from app.models.task import Task  # noqa: E402
+from app.routes.tasks import _apply_update  # noqa: E402
+
+USERS = [f"bench-coalesce-{index}" for index in range(10)]
+
+
+def seed(engine, rows: int) -> list:
+    now = datetime.utcnow()
+    tasks = [
+        {"id": uuid4(), "user_id": USERS[index % len(USERS)], "title": f"Task {index}",
+         "description": None, "completed": False, "created_at": now, "updated_at": now}
+        for index in range(rows)
+    ]
+    with Session(engine) as db:
+        db.exec(delete(Task).where(Task.user_id.in_(USERS)))
+        db.exec(insert(Task), params=tasks)
+        db.commit()
+    return [(task["id"], task["user_id"]) for task in tasks]
+
+
+def writes_for(tasks: list) -> list:
+    # The coalesced routes' two shapes: toggles and title edits
+    writes = []
+    for index, (task_id, user_id) in enumerate(tasks):
+        if index % 2:
+            values = {"completed": not_(Task.completed), "updated_at": datetime.utcnow()}
+        else:
+            values = {"title": f"Edited {index}", "updated_at": datetime.utcnow()}
+        writes.append((user_id, _apply_update, (task_id, user_id, values)))
+    return writes
+
+
+def measure(engine, tasks: list, repeat: int) -> float:
+    timings = []
+    for attempt in range(repeat + 1):
+        writes = writes_for(tasks)
+        with Session(engine) as db:
+            start = time.perf_counter()
+            write_coalescer.apply_writes(db, writes)
+            elapsed = time.perf_counter() - start
+        if attempt:  # The first run warms up
+            timings.append(elapsed)
+    return min(timings)
+
+
+def main():
+    create_db_and_tables()
+    engine = get_engine()
+    set_based = dict(write_coalescer._set_based)
+    results = []
+    for batch_size in (int(size) for size in args.batch_sizes.split(",")):
+        tasks = seed(engine, batch_size)
+        write_coalescer._set_based.clear()
+        write_by_write_s = measure(engine, tasks, args.repeat)
+        write_coalescer._set_based.update(set_based)
+        set_based_s = measure(engine, tasks, args.repeat)
+        results.append({
+            "batch_size": batch_size,
+            "write_by_write_ms": round(write_by_write_s * 1000, 3),
+            "set_based_ms": round(set_based_s * 1000, 3),
+            "speedup": round(write_by_write_s / set_based_s, 2),
+        })
+
+    print(json.dumps({"dialect": engine.dialect.name, "batches": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# Production server profile: gunicorn managing uvicorn workers
+#
+#   gunicorn -c gunicorn.conf.py app.main:app
+#
+# Every value can be overridden from the environment (see .env.example).
+# Kept free of app imports so the worker count is known before the app loads.
+import os
+
+
+def _read_int(path: str):
+    try:
+        with open(path) as handle:
+            value = handle.read().strip()
+    except OSError:
+        return None
+    return int(value) if value.isdigit() else None
+
+
+def cpu_limit() -> float:
+    """CPUs this process may use: the cgroup quota if any, else the affinity mask"""
+    cpus = float(len(os.sched_getaffinity(0))) if hasattr(os, "sched_getaffinity") else float(os.cpu_count() or 1)
+
+    # cgroup v2: "<quota> <period>" or "max <period>"
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as handle:
+            quota, period = handle.read().split()
+        if quota != "max":
+            return min(cpus, int(quota) / int(period))
+    except (OSError, ValueError):
+        pass
+
+    # cgroup v1: quota is -1 when unlimited
+    quota = _read_int("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+    period = _read_int("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+    if quota and period:
+        return min(cpus, quota / period)
+    return cpus
+
+
+def memory_limit_mb():
+    """Memory available to the dyno/container in MB: cgroup limit, else physical RAM"""
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        limit = _read_int(path)
+        # cgroup v1 reports "no limit" as a huge number
+        if limit and limit < 1 << 50:
+            return limit // (1024 * 1024)
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def autotune_workers() -> int:
+    """
+    Worker count from the CPU and memory limits
+
+    GUNICORN_WORKERS_PER_CPU workers per CPU (request handling is mostly
+    waiting on the database), but no more than fit in memory at
+    GUNICORN_WORKER_MEMORY_MB each, and never more than GUNICORN_MAX_WORKERS.
+    """
+    per_cpu = float(os.environ.get("GUNICORN_WORKERS_PER_CPU", "2"))
+    worker_memory = int(os.environ.get("GUNICORN_WORKER_MEMORY_MB", "160"))
+    max_workers = int(os.environ.get("GUNICORN_MAX_WORKERS", "8"))
+
+    by_cpu = max(1, int(cpu_limit() * per_cpu))
+    memory = memory_limit_mb()
+    by_memory = max(1, memory // worker_memory) if memory else by_cpu
+    return max(1, min(by_cpu, by_memory, max_workers))
+
+
+# Heroku sets WEB_CONCURRENCY from the dyno size; otherwise measure
+workers = int(os.environ.get("WEB_CONCURRENCY") or autotune_workers())
+# The app reads this to split DB_CONNECTION_BUDGET between the workers
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+worker_class = "uvicorn_worker.UvicornWorker"
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+# Import the app once in the master; workers fork with its modules already
+# loaded and share those pages copy-on-write. Engines and pools are created
+# lazily, so no database connection exists before the fork.
+preload_app = True
+
+# Recycle each worker after this many requests (jittered so they do not all
+# restart together) to bound memory creep from fragmentation or leaks
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+
+# SIGTERM lets in-flight requests finish for up to graceful_timeout seconds;
+# Heroku sends SIGKILL 30 seconds after SIGTERM, so stay below that
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "25"))
+# A worker whose event loop is stuck this long is restarted
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "5"))
+
+# Heroku's router terminates TLS and sets X-Forwarded-*
+forwarded_allow_ips = "*"
+# Heartbeat files on tmpfs; a disk-backed /tmp can stall workers
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+accesslog = None
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    server.log.info(
+        "Starting %d worker(s): %.1f CPU(s), %s MB memory limit",
+        workers, cpu_limit(), memory_limit_mb()
+    )
+
+
+def post_fork(server, worker):
+    # Never share pooled connections with the master (a no-op unless
+    # something opened one before forking)
+    from app.database import dispose_engines_after_fork
+
+    dispose_engines_after_fork()
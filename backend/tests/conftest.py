@@ -0,0 +1,43 @@
+# Shared test setup: a throwaway SQLite database and signed-in users
+import os
+import tempfile
+import time
+from pathlib import Path
+from uuid import uuid4
+
+# Settings are read at import, so the environment comes first
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{Path(tempfile.mkdtemp(prefix='todo-tests-')) / 'test.db'}")
+os.environ.setdefault("JWT_SECRET", "test-secret-test-secret-test-secret")
+os.environ.setdefault("BETTER_AUTH_SECRET", "test-secret")
+os.environ.setdefault("CORS_ORIGINS", "http://localhost:3000")
+os.environ.setdefault("RATE_LIMIT_BACKEND", "none")
+os.environ.setdefault("METRICS_TOKEN", "test-metrics-token")
+
+import jwt
+import pytest
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.main import app
+
+
+def auth_headers(user_id: str) -> dict:
+    token = jwt.encode({"sub": user_id, "exp": int(time.time()) + 3600}, settings.JWT_SECRET, algorithm="HS256")
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture(scope="session")
+def client():
+    # Runs the startup handlers once, which create the schema
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def user_id() -> str:
+    # A fresh user per test keeps tests independent within the shared database
+    return f"user-{uuid4().hex[:12]}"
+
+
+@pytest.fixture
+def headers(user_id) -> dict:
+    return auth_headers(user_id)
@@ -0,0 +1,129 @@
+# POST /api/{user_id}/tasks/batch
+from uuid import UUID, uuid4
+from sqlmodel import Session, not_, select, update
+from app.config import settings
+from app.database import get_engine
+from app.models.task import Task
+from app.models.tombstone import TaskTombstone
+from app.routes.batch import _apply_batch
+from app.schemas.task import TaskBatchRequest
+from tests.conftest import auth_headers
+
+
+def _create(client, user_id, headers, title, **fields):
+    response = client.post(f"/api/{user_id}/tasks", json={"title": title, **fields}, headers=headers)
+    assert response.status_code == 201
+    return response.json()
+
+
+def _batch(client, user_id, headers, operations):
+    return client.post(f"/api/{user_id}/tasks/batch", json={"operations": operations}, headers=headers)
+
+
+def test_mixed_operations_apply_in_order(client, user_id, headers):
+    kept = _create(client, user_id, headers, "kept")
+    removed = _create(client, user_id, headers, "removed")
+
+    response = _batch(client, user_id, headers, [
+        {"op": "create", "data": {"title": "new"}},
+        {"op": "update", "id": kept["id"], "data": {"title": "renamed"}},
+        {"op": "toggle", "id": kept["id"]},
+        {"op": "delete", "id": removed["id"]},
+        {"op": "toggle", "id": removed["id"]},
+    ])
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [(result["op"], result["status"]) for result in results] == [
+        ("create", 201), ("update", 200), ("toggle", 200), ("delete", 204), ("toggle", 404)
+    ]
+    assert results[2]["task"]["title"] == "renamed" and results[2]["task"]["completed"] is True
+
+    tasks = {task["title"]: task for task in client.get(f"/api/{user_id}/tasks", headers=headers).json()}
+    assert set(tasks) == {"new", "renamed"}
+    assert tasks["renamed"]["completed"] is True
+
+
+def test_missing_and_foreign_ids_are_404(client, user_id, headers):
+    other_user = f"other-{uuid4().hex[:12]}"
+    foreign = _create(client, other_user, auth_headers(other_user), "theirs")
+
+    response = _batch(client, user_id, headers, [
+        {"op": "toggle", "id": str(uuid4())},
+        {"op": "delete", "id": foreign["id"]},
+        {"op": "update", "id": foreign["id"], "data": {"title": "mine now"}},
+    ])
+
+    assert [result["status"] for result in response.json()["results"]] == [404, 404, 404]
+    assert client.get(f"/api/{other_user}/tasks/{foreign['id']}", headers=auth_headers(other_user)).json()["title"] == "theirs"
+
+
+def test_oversized_batch_is_413(client, user_id, headers):
+    operations = [{"op": "create", "data": {"title": "x"}}] * (settings.TASKS_BATCH_MAX_OPERATIONS + 1)
+    response = _batch(client, user_id, headers, operations)
+    assert response.status_code == 413
+    assert client.get(f"/api/{user_id}/tasks", headers=headers).json() == []
+
+
+def test_other_validation_errors_stay_422(client, user_id, headers):
+    assert _batch(client, user_id, headers, []).status_code == 422
+    assert _batch(client, user_id, headers, [{"op": "bad"}]).status_code == 422
+    assert client.post(f"/api/{user_id}/tasks", json={}, headers=headers).status_code == 422
+
+
+class _WriteAfterRead:
+    """Session wrapper running write() right after the batch's first read"""
+
+    def __init__(self, db: Session, write):
+        self.db = db
+        self.write = write
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+    def exec(self, *args, **kwargs):
+        result = self.db.exec(*args, **kwargs)
+        if self.write is None:
+            return result
+        rows = result.all()
+        write, self.write = self.write, None
+        write()
+        return rows
+
+
+def test_concurrent_toggle_and_update_are_not_overwritten(client, user_id, headers):
+    task = _create(client, user_id, headers, "original")
+
+    def concurrent_write():
+        # Another request toggles and renames the task between the batch's
+        # read and its write
+        with Session(get_engine()) as other:
+            other.exec(
+                update(Task).where(Task.id == UUID(task["id"])).values(completed=not_(Task.completed), title="renamed")
+            )
+            other.commit()
+
+    batch = TaskBatchRequest(operations=[{"op": "toggle", "id": task["id"]}])
+    with Session(get_engine()) as db:
+        _apply_batch(_WriteAfterRead(db, concurrent_write), user_id, batch.operations)
+
+    with Session(get_engine()) as db:
+        row = db.exec(select(Task.title, Task.completed).where(Task.id == UUID(task["id"]))).one()
+    # Both toggles count, and the batch did not write back the old title
+    assert row.title == "renamed"
+    assert row.completed is False
+
+
+def test_concurrently_deleted_task_gets_one_tombstone(client, user_id, headers):
+    task = _create(client, user_id, headers, "doomed")
+
+    def concurrent_delete():
+        assert client.delete(f"/api/{user_id}/tasks/{task['id']}", headers=headers).status_code == 204
+
+    batch = TaskBatchRequest(operations=[{"op": "delete", "id": task["id"]}])
+    with Session(get_engine()) as db:
+        _apply_batch(_WriteAfterRead(db, concurrent_delete), user_id, batch.operations)
+
+    with Session(get_engine()) as db:
+        tombstones = db.exec(select(TaskTombstone.task_id).where(TaskTombstone.user_id == user_id)).all()
+    assert tombstones == [UUID(task["id"])]
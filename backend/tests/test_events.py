@@ -0,0 +1,62 @@
+# Event stream connection limit under concurrent connects
+import asyncio
+from app.config import settings
+from app.events import task_events
+from app.main import app
+from tests.conftest import auth_headers
+
+
+def _headers(user_id: str) -> list:
+    return [(name.lower().encode(), value.encode()) for name, value in auth_headers(user_id).items()]
+
+
+async def _open_stream(user_id: str, disconnect: asyncio.Event) -> int:
+    """Connect to the event stream, hold it until disconnect, return the status"""
+    status = None
+    sent_request = False
+
+    async def receive():
+        nonlocal sent_request
+        if not sent_request:
+            sent_request = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": f"/api/{user_id}/tasks/events",
+        "raw_path": f"/api/{user_id}/tasks/events".encode(), "query_string": b"",
+        "root_path": "", "headers": _headers(user_id),
+        "client": ("127.0.0.1", 50000), "server": ("testserver", 80),
+    }
+    await app(scope, receive, send)
+    return status
+
+
+def test_concurrent_streams_respect_connection_limit():
+    limit = settings.TASK_EVENTS_MAX_CONNECTIONS_PER_USER
+    user_id = "events-limit-user"
+
+    async def scenario():
+        disconnect = asyncio.Event()
+        streams = [asyncio.create_task(_open_stream(user_id, disconnect)) for _ in range(limit + 3)]
+        # Rejected connects finish on their own; accepted ones stay open
+        await asyncio.wait(streams, timeout=2)
+        open_count = task_events.connection_count(user_id)
+        disconnect.set()
+        statuses = await asyncio.gather(*streams)
+        return open_count, statuses
+
+    open_count, statuses = asyncio.run(scenario())
+
+    assert open_count == limit
+    assert statuses.count(200) == limit
+    assert statuses.count(429) == 3
+    # Every slot is released once the clients disconnect
+    assert task_events.connection_count(user_id) == 0
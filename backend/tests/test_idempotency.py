@@ -0,0 +1,136 @@
+# Idempotency-Key replay (app/idempotency.py, app/middleware/idempotency.py)
+import asyncio
+import json
+from datetime import datetime, timedelta
+from sqlmodel import Session, insert, select
+from app.config import settings
+from app.database import get_engine
+from app.idempotency import (
+    ResponseCache,
+    StoredResponse,
+    complete_key,
+    request_fingerprint,
+    reserve_key,
+)
+from app.middleware.idempotency import IdempotencyMiddleware
+from app.models.idempotency import IdempotencyRecord
+
+BODY = json.dumps({"title": "once"}).encode()
+
+
+def _post(client, user_id, headers, key, body=BODY):
+    return client.post(
+        f"/api/{user_id}/tasks", content=body,
+        headers={**headers, "Idempotency-Key": key, "Content-Type": "application/json"}
+    )
+
+
+def _reserve(user_id, key, expires_at, body=BODY):
+    # A reservation left behind by a request that is running (or died)
+    with Session(get_engine()) as db:
+        db.exec(insert(IdempotencyRecord).values(
+            user_id=user_id, key=key, expires_at=expires_at,
+            request_hash=request_fingerprint("POST", f"/api/{user_id}/tasks", b"", body)
+        ))
+        db.commit()
+
+
+def _task_count(client, user_id, headers) -> int:
+    return len(client.get(f"/api/{user_id}/tasks", headers=headers).json())
+
+
+def test_retry_replays_the_stored_response(client, user_id, headers):
+    first = _post(client, user_id, headers, "create-1")
+    retry = _post(client, user_id, headers, "create-1")
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert _task_count(client, user_id, headers) == 1
+
+
+def test_same_key_different_body_is_422(client, user_id, headers):
+    _post(client, user_id, headers, "create-2")
+    response = _post(client, user_id, headers, "create-2", json.dumps({"title": "other"}).encode())
+    assert response.status_code == 422
+    assert _task_count(client, user_id, headers) == 1
+
+
+def test_retry_during_a_live_request_is_409(client, user_id, headers):
+    _reserve(user_id, "create-3", datetime.utcnow() + timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS))
+    response = _post(client, user_id, headers, "create-3")
+
+    assert response.status_code == 409
+    assert 1 <= int(response.headers["Retry-After"]) <= settings.IDEMPOTENCY_LEASE_SECONDS
+    assert _task_count(client, user_id, headers) == 0
+
+
+def test_retry_takes_over_a_stale_reservation(client, user_id, headers):
+    # The original request's worker died: its lease lapsed a second ago
+    _reserve(user_id, "create-4", datetime.utcnow() - timedelta(seconds=1))
+    response = _post(client, user_id, headers, "create-4")
+
+    assert response.status_code == 201
+    assert "Idempotent-Replayed" not in response.headers
+    assert _post(client, user_id, headers, "create-4").headers["Idempotent-Replayed"] == "true"
+    assert _task_count(client, user_id, headers) == 1
+
+
+def test_owner_whose_lease_lapsed_cannot_overwrite_the_new_owner(client, user_id):
+    request_hash = request_fingerprint("POST", "/x", b"", b"")
+    stale_lease = datetime.utcnow() - timedelta(seconds=1)
+    new_lease = datetime.utcnow() + timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS)
+    response = StoredResponse(request_hash, 201, "application/json", b"{}", None)
+
+    with Session(get_engine()) as db:
+        assert reserve_key(db, user_id, "k", request_hash, stale_lease) is None
+        # A retry sweeps the lapsed reservation and takes the key
+        assert reserve_key(db, user_id, "k", request_hash, new_lease) is None
+        assert complete_key(db, user_id, "k", stale_lease, response) is None
+        stored = complete_key(db, user_id, "k", new_lease, response)
+
+    assert stored.status_code == 201
+    assert stored.expires_at > datetime.utcnow() + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS - 60)
+
+
+def test_long_request_keeps_renewing_its_lease(client, user_id, headers, monkeypatch):
+    monkeypatch.setattr(settings, "IDEMPOTENCY_LEASE_SECONDS", 0.3)
+    calls = []
+
+    async def slow_app(scope, receive, send):
+        calls.append(scope["path"])
+        await asyncio.sleep(1.0)
+        await send({"type": "http.response.start", "status": 201, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": b"done"})
+
+    middleware = IdempotencyMiddleware(slow_app, ResponseCache(10))
+
+    async def request(delay: float) -> int:
+        await asyncio.sleep(delay)
+        statuses = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                statuses.append(message["status"])
+
+        scope = {
+            "type": "http", "method": "POST", "path": "/slow", "query_string": b"",
+            "headers": [(b"authorization", headers["Authorization"].encode()), (b"idempotency-key", b"slow")],
+        }
+        await middleware(scope, receive, send)
+        return statuses[0]
+
+    async def scenario():
+        # The retry arrives after several lease periods, while the original runs
+        return await asyncio.gather(request(0), request(0.7))
+
+    assert asyncio.run(scenario()) == [201, 409]
+    assert calls == ["/slow"]
+    with Session(get_engine()) as db:
+        status_code = db.exec(select(IdempotencyRecord.status_code).where(
+            IdempotencyRecord.user_id == user_id, IdempotencyRecord.key == "slow"
+        )).one()
+    assert status_code == 201
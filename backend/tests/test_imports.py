@@ -0,0 +1,59 @@
+# POST /api/{user_id}/tasks/import
+import time
+from app.routes.imports import MAX_RECORD_LINES
+
+
+def _import_csv(client, user_id, headers, text: str):
+    response = client.post(
+        f"/api/{user_id}/tasks/import", content=text.encode(), headers={**headers, "Content-Type": "text/csv"}
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _titles(client, user_id, headers) -> list:
+    tasks = client.get(f"/api/{user_id}/tasks", params={"limit": 200}, headers=headers).json()
+    return sorted(task["title"] for task in tasks)
+
+
+def test_quoted_field_spanning_lines(client, user_id, headers):
+    result = _import_csv(client, user_id, headers, 'title,description\n"two\nlines","say ""hi"""\nafter,x\n')
+    assert (result["imported"], result["failed"]) == (2, 0)
+    assert _titles(client, user_id, headers) == ["after", "two\nlines"]
+
+
+def test_stray_quote_in_unquoted_field_is_literal(client, user_id, headers):
+    text = 'title,description\nBuy 2" screws,hardware\nnext,row\nlast,"quoted, field"\n'
+    result = _import_csv(client, user_id, headers, text)
+    assert (result["imported"], result["failed"]) == (3, 0)
+    assert _titles(client, user_id, headers) == ['Buy 2" screws', "last", "next"]
+
+
+def test_unterminated_quote_costs_one_row(client, user_id, headers):
+    rows = [f"row{i},x" for i in range(MAX_RECORD_LINES + 20)]
+    text = "title,description\nfirst,x\n" + '"never closed,x\n' + "\n".join(rows) + "\n"
+    result = _import_csv(client, user_id, headers, text)
+
+    assert result["failed"] == 1
+    assert result["errors"] == [{"line": 3, "error": "Unterminated quoted field"}]
+    assert result["imported"] == len(rows) + 1
+
+
+def test_unterminated_quote_at_end_of_file(client, user_id, headers):
+    result = _import_csv(client, user_id, headers, 'title\nok\n"open\nafter\n')
+    assert result["errors"] == [{"line": 3, "error": "Unterminated quoted field"}]
+    assert result["imported"] == 2
+
+
+def test_large_csv_import_is_linear(client, user_id, headers):
+    def run(rows: int) -> float:
+        # A stray quote up front used to swallow every row after it
+        body = 'title,description\n2" bolts,x\n' + "".join(f'task {i},"line one\nline ""two"""\n' for i in range(rows))
+        start = time.perf_counter()
+        result = _import_csv(client, user_id, headers, body)
+        assert (result["imported"], result["failed"]) == (rows + 1, 0)
+        return time.perf_counter() - start
+
+    small, large = run(2000), run(16000)
+    # 8x the rows; quadratic parsing would take ~64x as long
+    assert large < small * 24
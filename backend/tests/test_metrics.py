@@ -0,0 +1,11 @@
+# GET /metrics
+from app.config import settings
+
+
+def test_metrics_requires_the_token(client):
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+    response = client.get("/metrics", headers={"Authorization": f"Bearer {settings.METRICS_TOKEN}"})
+    assert response.status_code == 200
+    assert "http_request_duration_seconds" in response.text
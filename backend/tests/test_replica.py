@@ -0,0 +1,49 @@
+# Read-your-writes against a read replica, decided on the server
+import pytest
+from sqlmodel import Session, SQLModel, create_engine
+from app import database
+from app.models.revision import UserRevision
+from app.replica import read_router
+
+
+@pytest.fixture
+def replica(monkeypatch, tmp_path):
+    """A second SQLite database standing in for a usable, lag-free replica"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr(database, "get_read_engine", lambda: engine)
+    monkeypatch.setattr(read_router, "enabled", True)
+    monkeypatch.setattr(read_router, "healthy", True)
+    monkeypatch.setattr(read_router, "lag", 0.0)
+    yield engine
+    engine.dispose()
+
+
+def _replay(replica, user_id):
+    with Session(database.get_engine()) as primary:
+        revision = primary.get(UserRevision, user_id).revision
+    with Session(replica) as session:
+        session.merge(UserRevision(user_id=user_id, revision=revision))
+        session.commit()
+
+
+def test_user_without_writes_reads_from_replica(replica, user_id):
+    assert database.replica_caught_up(user_id)
+    assert database.read_engine_for(user_id) is replica
+
+
+def test_write_from_another_worker_stays_on_primary_until_replayed(client, replica, user_id, headers):
+    assert client.post(f"/api/{user_id}/tasks", json={"title": "a"}, headers=headers).status_code == 201
+    # Another worker never saw the write, so it holds no pin for this user
+    read_router._pins.pop(user_id, None)
+
+    assert not database.replica_caught_up(user_id)
+    assert database.read_engine_for(user_id) is database.get_engine()
+
+    _replay(replica, user_id)
+    assert database.replica_caught_up(user_id)
+    assert database.read_engine_for(user_id) is replica
+
+    assert client.post(f"/api/{user_id}/tasks", json={"title": "b"}, headers=headers).status_code == 201
+    read_router._pins.pop(user_id, None)
+    assert database.read_engine_for(user_id) is database.get_engine()
@@ -0,0 +1,37 @@
+# GET /api/{user_id}/tasks/stats
+from datetime import timedelta
+from uuid import UUID
+from sqlmodel import Session, update
+from app.archive import archive_batch, archive_cutoff
+from app.database import get_engine
+from app.models.task import Task
+
+
+def _create(client, user_id, headers, title):
+    response = client.post(f"/api/{user_id}/tasks", json={"title": title}, headers=headers)
+    assert response.status_code == 201
+    return response.json()
+
+
+def _stats(client, user_id, headers, **params):
+    response = client.get(f"/api/{user_id}/tasks/stats", params=params, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_archived_tasks_stay_counted(client, user_id, headers):
+    done = _create(client, user_id, headers, "done")
+    _create(client, user_id, headers, "open")
+    client.patch(f"/api/{user_id}/tasks/{done['id']}/complete", headers=headers)
+    before = _stats(client, user_id, headers, days=7)
+
+    with Session(get_engine()) as db:
+        db.exec(update(Task).where(Task.id == UUID(done["id"])).values(updated_at=archive_cutoff() - timedelta(days=1)))
+        db.commit()
+        assert archive_batch(db, archive_cutoff(), 100).get(user_id) == 1
+
+    after = _stats(client, user_id, headers, days=7)
+    assert (after["total"], after["completed"], after["pending"], after["archived"]) == (2, 1, 1, 1)
+    assert after["completion_rate"] == before["completion_rate"] == 0.5
+    assert after["created_per_day"] == before["created_per_day"]
+    assert before["archived"] == 0
@@ -0,0 +1,150 @@
+# GET /api/{user_id}/tasks/sync
+from datetime import datetime, timedelta
+from uuid import UUID, uuid4
+from sqlmodel import Session, insert, update
+from app.archive import archive_batch, archive_cutoff
+from app.config import settings
+from app.database import get_engine
+from app.models.task import Task
+from app.revisions import bump_revision
+from app.routes.sync import decode_sync_token, encode_sync_token
+
+
+class SyncClient:
+    """A client keeping a local copy of the task list through /tasks/sync"""
+
+    def __init__(self, client, user_id, headers):
+        self.client = client
+        self.user_id = user_id
+        self.headers = headers
+        self.tasks = {}
+        self.token = None
+        self.pages = 0
+
+    def fetch_page(self, limit: int = settings.TASKS_PAGE_MAX_LIMIT) -> dict:
+        params = {"limit": limit}
+        if self.token:
+            params["since"] = self.token
+        response = self.client.get(f"/api/{self.user_id}/tasks/sync", params=params, headers=self.headers)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        for task in page["tasks"]:
+            self.tasks[task["id"]] = task
+        for task_id in page["deleted"]:
+            self.tasks.pop(task_id, None)
+        self.token = page["sync_token"]
+        self.pages += 1
+        return page
+
+    def sync(self, limit: int = settings.TASKS_PAGE_MAX_LIMIT):
+        while self.fetch_page(limit)["has_more"]:
+            pass
+
+    def server_tasks(self) -> dict:
+        tasks = self.client.get(f"/api/{self.user_id}/tasks", params={"limit": 500}, headers=self.headers).json()
+        return {task["id"]: task for task in tasks}
+
+
+def _create(client, user_id, headers, title):
+    return client.post(f"/api/{user_id}/tasks", json={"title": title}, headers=headers).json()
+
+
+def test_snapshot_pages_cover_every_task(client, user_id, headers):
+    for i in range(7):
+        _create(client, user_id, headers, f"t{i}")
+
+    sync = SyncClient(client, user_id, headers)
+    sync.sync(limit=3)
+
+    assert sync.pages == 3
+    assert sync.tasks == sync.server_tasks()
+
+
+def test_paging_stays_consistent_across_concurrent_writes(client, user_id, headers):
+    created = [_create(client, user_id, headers, f"t{i}") for i in range(10)]
+    sync = SyncClient(client, user_id, headers)
+    first = sync.fetch_page(limit=3)
+    assert first["has_more"] and first["full"]
+    sent = {task["id"] for task in first["tasks"]}
+    unsent = [task for task in created if task["id"] not in sent]
+
+    # Writes landing between pages: to tasks already sent and not yet sent,
+    # a new task, a delete and a batch
+    client.put(f"/api/{user_id}/tasks/{first['tasks'][0]['id']}", json={"title": "sent, renamed"}, headers=headers)
+    client.patch(f"/api/{user_id}/tasks/{unsent[0]['id']}/complete", headers=headers)
+    client.delete(f"/api/{user_id}/tasks/{unsent[1]['id']}", headers=headers)
+    _create(client, user_id, headers, "created while paging")
+    client.post(f"/api/{user_id}/tasks/batch", json={"operations": [
+        {"op": "delete", "id": first["tasks"][1]["id"]},
+        {"op": "update", "id": unsent[2]["id"], "data": {"title": "batch renamed"}},
+    ]}, headers=headers)
+
+    while sync.fetch_page(limit=3)["has_more"]:
+        pass
+    # The next sync picks up whatever the paged snapshot could not
+    sync.sync(limit=3)
+
+    assert sync.tasks == sync.server_tasks()
+
+
+def test_batch_and_archive_deletes_appear_in_delta(client, user_id, headers):
+    batch_deleted = _create(client, user_id, headers, "batch deleted")
+    archived = _create(client, user_id, headers, "archived")
+    kept = _create(client, user_id, headers, "kept")
+    sync = SyncClient(client, user_id, headers)
+    sync.sync()
+
+    client.post(f"/api/{user_id}/tasks/batch", json={"operations": [
+        {"op": "delete", "id": batch_deleted["id"]},
+        {"op": "toggle", "id": archived["id"]},
+    ]}, headers=headers)
+    # Age the completed task past the archive cutoff, then archive it
+    with Session(get_engine()) as db:
+        db.exec(update(Task).where(Task.id == UUID(archived["id"])).values(
+            updated_at=archive_cutoff() - timedelta(days=1)
+        ))
+        db.commit()
+        assert archive_batch(db, archive_cutoff(), 100).get(user_id) == 1
+
+    page = sync.fetch_page()
+    assert {batch_deleted["id"], archived["id"]} <= set(page["deleted"])
+    assert set(sync.tasks) == {kept["id"]}
+
+
+def test_overlap_resends_rows_stamped_before_the_token(client, user_id, headers):
+    sync = SyncClient(client, user_id, headers)
+    sync.sync()
+    _, synced_at = decode_sync_token(sync.token)
+
+    # A transaction that stamped its row before the sync read it, but
+    # committed only afterwards
+    late_id = uuid4()
+    stamped = synced_at - timedelta(seconds=settings.TASKS_SYNC_OVERLAP_SECONDS / 2)
+    with Session(get_engine()) as db:
+        db.exec(insert(Task).values(
+            id=late_id, user_id=user_id, title="late commit", completed=False,
+            created_at=stamped, updated_at=stamped
+        ))
+        bump_revision(db, user_id)
+        db.commit()
+
+    page = sync.fetch_page()
+    assert str(late_id) in {task["id"] for task in page["tasks"]}
+
+
+def test_unchanged_revision_returns_the_same_token(client, user_id, headers):
+    _create(client, user_id, headers, "a")
+    sync = SyncClient(client, user_id, headers)
+    sync.sync()
+    token = sync.token
+
+    page = sync.fetch_page()
+    assert page["tasks"] == [] and page["deleted"] == [] and not page["has_more"]
+    assert page["sync_token"] == token
+
+
+def test_expired_and_malformed_tokens(client, user_id, headers):
+    expired = encode_sync_token(1, datetime.utcnow() - timedelta(days=settings.TASKS_SYNC_TOMBSTONE_RETENTION_DAYS + 1))
+    url = f"/api/{user_id}/tasks/sync"
+    assert client.get(url, params={"since": expired}, headers=headers).status_code == 410
+    assert client.get(url, params={"since": "junk"}, headers=headers).status_code == 400
@@ -0,0 +1,32 @@
+# Task CRUD routes
+from uuid import uuid4
+from tests.conftest import auth_headers
+
+
+def test_get_task_revalidates_with_304(client, user_id, headers):
+    task = client.post(f"/api/{user_id}/tasks", json={"title": "a"}, headers=headers).json()
+    response = client.get(f"/api/{user_id}/tasks/{task['id']}", headers=headers)
+    etag = response.headers["ETag"]
+
+    revalidated = client.get(f"/api/{user_id}/tasks/{task['id']}", headers={**headers, "If-None-Match": etag})
+    assert revalidated.status_code == 304
+
+
+def test_get_deleted_task_with_current_etag_is_404(client, user_id, headers):
+    keep = client.post(f"/api/{user_id}/tasks", json={"title": "keep"}, headers=headers).json()
+    gone = client.post(f"/api/{user_id}/tasks", json={"title": "gone"}, headers=headers).json()
+    client.delete(f"/api/{user_id}/tasks/{gone['id']}", headers=headers)
+    etag = client.get(f"/api/{user_id}/tasks/{keep['id']}", headers=headers).headers["ETag"]
+
+    for task_id in (gone["id"], str(uuid4())):
+        response = client.get(f"/api/{user_id}/tasks/{task_id}", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 404
+
+
+def test_get_foreign_task_with_current_etag_is_404(client, user_id, headers):
+    other_user = f"other-{uuid4().hex[:12]}"
+    foreign = client.post(f"/api/{other_user}/tasks", json={"title": "theirs"}, headers=auth_headers(other_user)).json()
+    etag = client.get(f"/api/{user_id}/tasks", headers=headers).headers["ETag"]
+
+    response = client.get(f"/api/{user_id}/tasks/{foreign['id']}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 404
@@ -0,0 +1,78 @@
+# Group commit of task updates (WRITE_COALESCE_ENABLED)
+import asyncio
+from datetime import datetime
+from uuid import UUID, uuid4
+from sqlalchemy import event
+from sqlmodel import Session, not_
+from app.database import get_engine
+from app.models.task import Task
+from app.routes.tasks import _apply_update
+from app.write_coalescer import WriteCoalescer, apply_writes
+from tests.conftest import auth_headers
+
+
+def _create(client, user_id, title):
+    response = client.post(f"/api/{user_id}/tasks", json={"title": title}, headers=auth_headers(user_id))
+    assert response.status_code == 201
+    return UUID(response.json()["id"])
+
+
+def _toggle(task_id, user_id):
+    return (user_id, _apply_update, (task_id, user_id, {"completed": not_(Task.completed), "updated_at": datetime.utcnow()}))
+
+
+def _rename(task_id, user_id, title):
+    return (user_id, _apply_update, (task_id, user_id, {"title": title, "updated_at": datetime.utcnow()}))
+
+
+def test_updates_run_as_one_statement_per_shape(client, user_id):
+    first, second, third = (_create(client, user_id, title) for title in ("a", "b", "c"))
+    other_user = f"{user_id}-other"
+    foreign = _create(client, other_user, "theirs")
+    writes = [
+        _toggle(first, user_id),
+        _toggle(second, user_id),
+        _rename(third, user_id, "renamed"),
+        _toggle(uuid4(), user_id),
+        _toggle(foreign, user_id),
+        _toggle(first, user_id),
+    ]
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = get_engine()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        with Session(engine) as db:
+            results = apply_writes(db, writes)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    updates = [statement for statement in statements if statement.lstrip().upper().startswith("UPDATE TASKS")]
+    assert len(updates) == 2
+    assert [result.id if result is not None else None for result in results] == [first, second, third, None, None, first]
+    # first was toggled twice within the batch
+    assert results[0].completed is False and results[1].completed is True
+    assert results[2].title == "renamed"
+    with Session(engine) as db:
+        assert db.get(Task, foreign).completed is False
+
+
+def test_concurrent_submits_share_a_batch(client, user_id):
+    task_ids = [_create(client, user_id, f"t{index}") for index in range(5)]
+    coalescer = WriteCoalescer(window=0.01, max_batch=100)
+
+    async def toggle_all():
+        return await asyncio.gather(*(
+            coalescer.submit(user_id, _apply_update, task_id, user_id, {"completed": not_(Task.completed)})
+            for task_id in task_ids
+        ))
+
+    results = asyncio.run(toggle_all())
+
+    assert [result.id for result in results] == task_ids
+    assert all(result.completed for result in results)
+    assert coalescer.batches == 1 and coalescer.fallbacks == 0